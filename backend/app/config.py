@@ -1,6 +1,7 @@
 """Configuration management using Pydantic Settings."""
+from functools import lru_cache
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -12,6 +13,9 @@ class Settings(BaseSettings):
     debug: bool = False
     log_level: str = "INFO"
 
+    # Region
+    cloud_provider: str = "AWS"  # provider serving this deployment (AWS or Azure)
+
     # Server
     host: str = "0.0.0.0"
     port: int = 8000
@@ -21,13 +25,83 @@ class Settings(BaseSettings):
     openweather_api_key: str
     openweather_base_url: str = "https://api.openweathermap.org/data/2.5"
     openweather_timeout: int = 10
+    openweather_update_interval: int = 600  # provider observation cadence
 
     # Redis
     redis_host: str = "localhost"
     redis_port: int = 6379
     redis_db: int = 0
     redis_password: Optional[str] = None
-    redis_cache_ttl: int = 3600  # 1 hour
+    redis_cache_ttl: int = 3600  # 1 hour, upper bound for adaptive TTLs
+    redis_connect_retries: int = 5
+    redis_connect_backoff: float = 0.5  # seconds, doubled per attempt
+    redis_key_prefix: str = "wt"
+    cache_generation_refresh_seconds: float = 1.0
+    cache_invalidation_batch_size: int = 500
+    cache_write_behind_max_pending: int = 1000
+    cache_write_behind_batch_size: int = 100
+    cache_write_behind_flush_interval: float = 0.05  # seconds to gather a batch
+    cache_ttl_adaptive: bool = True
+    cache_ttl_min: int = 60
+    cache_ttl_grace: int = 30  # seconds past the expected next observation
+    cache_ttl_volatile_factor: float = 0.5
+    cache_ttl_volatile_wind_speed: float = 10.0  # m/s
+
+    # Cache snapshots (disabled unless a path is set)
+    cache_snapshot_path: Optional[str] = None
+    cache_snapshot_interval: float = 300.0  # seconds, 0 disables periodic export
+    cache_snapshot_max_keys: int = 100000
+    cache_snapshot_restore_on_startup: bool = True
+    cache_snapshot_restore_timeout: float = 30.0  # seconds
+
+    # Bulk export (/weather/export)
+    cache_export_chunk_size: int = 500  # keys per SCAN + MGET round trip
+
+    # Cross-region cache replication (Redis Streams)
+    replication_enabled: bool = False
+    replication_peers: List[str] = []  # e.g. ["redis://:password@azure-redis:6379/0"]
+    replication_stream_maxlen: int = 100000
+    replication_batch_size: int = 200
+    replication_block_ms: int = 1000
+    replication_lease_ms: int = 10000  # one shipping worker per peer; taken over when it lapses
+
+    # Admission control for upstream-bound requests
+    admission_enabled: bool = True
+    admission_max_concurrent: int = 20
+    admission_max_queue: int = 50
+    admission_queue_timeout: float = 2.0  # seconds
+    admission_retry_after: int = 1  # seconds
+
+    # Per-client rate limiting ("<count>/<second|minute|hour|day>")
+    rate_limit_enabled: bool = True
+    rate_limit_default: str = "120/minute"
+    rate_limit_routes: Dict[str, str] = {"/weather": "60/minute", "/weather/export": "6/minute", "/cache": "10/minute"}
+    rate_limit_exempt: List[str] = ["/health", "/metrics", "/docs", "/openapi.json"]
+    rate_limit_trusted_proxies: int = 0  # Reverse proxies appending to X-Forwarded-For (nginx: 1)
+    rate_limit_api_keys: List[str] = []  # X-API-Key values limited per key instead of per IP
+
+    # Traffic analytics
+    analytics_enabled: bool = True
+    analytics_top_k: int = 20
+    analytics_cms_width: int = 2048
+    analytics_cms_depth: int = 4
+    analytics_hll_precision: int = 14
+    analytics_redis_merge: bool = False  # merge unique counts across pods via PFADD/PFMERGE
+    analytics_flush_interval: float = 10.0  # seconds
+
+    # Event loop monitoring
+    loop_monitor_enabled: bool = True
+    loop_monitor_interval: float = 0.1  # seconds
+    loop_stall_threshold: float = 0.25  # seconds
+    loop_stall_reports: int = 20
+
+    # Shared secret for /debug endpoints, sent as X-Debug-Token
+    debug_token: Optional[str] = None
+
+    # On-demand profiler (/debug/profile); keep disabled unless investigating
+    profiler_enabled: bool = False
+    profiler_max_seconds: int = 30
+    profiler_sample_interval: float = 0.005  # seconds
 
     # Prometheus
     prometheus_enabled: bool = True
@@ -44,5 +118,13 @@ class Settings(BaseSettings):
         if not self.redis_password or self.redis_password.lower() in ("null", "none", ""):
             self.redis_password = None
 
+    @property
+    def replication_active(self) -> bool:
+        """Whether cache writes are shipped to peer regions."""
+        return self.replication_enabled and bool(self.replication_peers)
+
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """Return application settings, parsed from the environment on first use."""
+    return Settings()
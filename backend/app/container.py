@@ -0,0 +1,156 @@
+"""Application dependency container managed by the FastAPI lifespan."""
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Any, Coroutine, Dict, Optional, Set
+from fastapi import HTTPException, Request
+from app.config import Settings
+from app.services.analytics import TrafficAnalytics
+from app.services.cache import CacheService
+from app.services.invalidation import InvalidationService
+from app.services.replication import ReplicationService
+from app.services.snapshot import SnapshotService
+from app.services.weather import WeatherService
+from app.utils.logging import get_logger
+from app.utils.loopmonitor import LoopMonitor
+from app.utils.profiler import Profiler
+
+logger = get_logger(__name__)
+
+
+class Container:
+    """
+    Holds the application's services and drives their lifecycle.
+
+    Construction performs no I/O. ``startup()`` creates clients and schedules
+    the Redis connection in the background so the worker can start serving
+    (in degraded mode) before Redis answers. When a cache snapshot is
+    configured, startup instead waits (bounded) for Redis and the restore so
+    the worker only reports ready with a warm cache.
+    """
+
+    def __init__(self, settings: Settings):
+        """Build services without connecting to anything."""
+        self._created_at = time.perf_counter()
+        self.settings = settings
+        self.startup_timings: Dict[str, float] = {}
+        self.redis_connected_after_ms: Optional[float] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+        with self._timed("services"):
+            self.cache = CacheService(settings)
+            self.analytics = TrafficAnalytics(settings, self.cache) if settings.analytics_enabled else None
+            self.weather = WeatherService(settings, self.cache, self.analytics)
+            self.invalidation = InvalidationService(settings, self.cache)
+            self.snapshot = SnapshotService(settings, self.cache)
+            self.replication = (
+                ReplicationService(settings, self.cache)
+                if settings.replication_active else None
+            )
+            self.loop_monitor = LoopMonitor(
+                interval=settings.loop_monitor_interval,
+                stall_threshold=settings.loop_stall_threshold,
+                max_reports=settings.loop_stall_reports
+            )
+            self.profiler = Profiler(sample_interval=settings.profiler_sample_interval)
+
+    @contextmanager
+    def _timed(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup_timings[phase] = round((time.perf_counter() - start) * 1000, 2)
+
+    def _elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self._created_at) * 1000, 2)
+
+    def spawn(self, coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+        """Run a background task owned by the container and cancelled on shutdown."""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def startup(self):
+        """Start services; Redis connects lazily in the background."""
+        if self.settings.loop_monitor_enabled:
+            with self._timed("loop_monitor"):
+                self.loop_monitor.start()
+        with self._timed("weather_client"):
+            await self.weather.start()
+        with self._timed("cache_write_behind"):
+            self.cache.start()
+        if self.settings.cache_snapshot_path and self.settings.cache_snapshot_restore_on_startup:
+            with self._timed("snapshot_restore"):
+                await self._warm_start()
+        if not self.cache.client:
+            with self._timed("redis_connect_scheduled"):
+                self.spawn(self._connect_cache())
+        if self.settings.cache_snapshot_path and self.settings.cache_snapshot_interval > 0:
+            self.spawn(self.snapshot.run_periodic_export())
+        if self.analytics and self.settings.analytics_redis_merge:
+            self.spawn(self._flush_analytics())
+        if self.replication:
+            for peer in self.replication.peers:
+                self.spawn(peer.run())
+        self.startup_timings["total"] = self._elapsed_ms()
+        logger.info("Application container started", extra={"startup_ms": self.startup_timings})
+
+    async def _connect_cache(self):
+        if await self.cache.connect():
+            self.redis_connected_after_ms = self._elapsed_ms()
+            logger.info("Redis cache connected", extra={
+                "connected_after_ms": self.redis_connected_after_ms
+            })
+        else:
+            logger.warning("Redis cache not available; serving without cache")
+
+    async def _warm_start(self):
+        async def connect_and_restore():
+            await self._connect_cache()
+            if self.cache.client:
+                await self.snapshot.restore()
+
+        try:
+            await asyncio.wait_for(
+                connect_and_restore(),
+                timeout=self.settings.cache_snapshot_restore_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Cache snapshot restore timed out; starting with a cold cache")
+
+    async def _flush_analytics(self):
+        while True:
+            await asyncio.sleep(self.settings.analytics_flush_interval)
+            await self.analytics.flush()
+
+    async def shutdown(self):
+        """Stop background work and close clients."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.loop_monitor.stop()
+        await self.invalidation.close()
+        await self.weather.close()
+        if self.replication:
+            # Releases the replication leases, which live in the local Redis
+            await self.replication.close()
+        await self.cache.close()
+
+    def startup_report(self) -> Dict[str, Any]:
+        """Startup time breakdown for diagnostics."""
+        return {
+            "phases_ms": {k: v for k, v in self.startup_timings.items() if k != "total"},
+            "total_ms": self.startup_timings.get("total"),
+            "redis_connected_after_ms": self.redis_connected_after_ms
+        }
+
+
+def get_container(request: Request) -> Container:
+    """FastAPI dependency returning the application's container."""
+    container = getattr(request.app.state, "container", None)
+    if container is None:
+        # The lifespan has not run (or has already shut down)
+        raise HTTPException(status_code=503, detail="Service is starting up")
+    return container
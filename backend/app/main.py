@@ -1,34 +1,90 @@
 """FastAPI application factory and endpoints."""
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 from datetime import datetime
+from typing import Optional
 import logging
+import secrets
 
-from app.config import settings
-from app.models import WeatherData, HealthCheck, ErrorResponse
-from app.services.weather import weather_service
-from app.services.cache import cache
+from app.config import Settings, get_settings
+from app.container import Container, get_container
+from app.models import WeatherData, HealthCheck, ErrorResponse, InvalidationJob
+from app.services.export import MEDIA_TYPES, export_stream
+from app.services.invalidation import escape_glob
+from app.services.localization import LANGUAGES, UNITS, normalize_lang
+from app.services.weather import cache_key
 from app.utils.logging import setup_logging, get_logger
+from app.utils.admission import AdmissionControlMiddleware
 from app.utils.metrics import MetricsMiddleware, api_health
+from app.utils.profiler import ProfilerBusyError, collapsed, speedscope
+from app.utils.ratelimit import RateLimitMiddleware
 
-# Setup logging
-setup_logging()
 logger = get_logger(__name__)
 
 
-def create_app() -> FastAPI:
-    """Create and configure FastAPI application."""
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    """
+    Create and configure FastAPI application.
+
+    Nothing is built at import time; servers load this as a factory
+    (``uvicorn app.main:create_app --factory``), so settings are only
+    parsed when the application is actually created.
+    """
+    settings = settings or get_settings()
+    setup_logging(settings.log_level)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        """Build the dependency container on startup and tear it down on shutdown."""
+        logger.info(f"Starting {settings.app_name} v{settings.app_version}")
+        logger.info(f"Debug mode: {settings.debug}")
+        logger.info(f"Log level: {settings.log_level}")
+        api_health.set(0)
+        container = Container(settings)
+        await container.startup()
+        app.state.container = container
+        try:
+            yield
+        finally:
+            logger.info(f"Shutting down {settings.app_name}")
+            del app.state.container
+            await container.shutdown()
 
     app = FastAPI(
         title=settings.app_name,
         version=settings.app_version,
         debug=settings.debug,
         docs_url="/docs",
-        openapi_url="/openapi.json"
+        openapi_url="/openapi.json",
+        lifespan=lifespan
     )
 
+    # Add admission control innermost so shed responses still get CORS headers and metrics
+    if settings.admission_enabled:
+        app.add_middleware(
+            AdmissionControlMiddleware,
+            paths=("/weather",),
+            max_concurrent=settings.admission_max_concurrent,
+            max_queue=settings.admission_max_queue,
+            queue_timeout=settings.admission_queue_timeout,
+            retry_after=settings.admission_retry_after
+        )
+
+    # Add rate limiting outside admission control so floods never occupy queue slots
+    if settings.rate_limit_enabled:
+        app.add_middleware(
+            RateLimitMiddleware,
+            default_rate=settings.rate_limit_default,
+            route_rates=settings.rate_limit_routes,
+            exempt_paths=settings.rate_limit_exempt,
+            key_prefix=settings.redis_key_prefix,
+            trusted_proxies=settings.rate_limit_trusted_proxies,
+            api_keys=settings.rate_limit_api_keys
+        )
+
     # Add CORS middleware to allow cross-origin requests from frontend
     app.add_middleware(
         CORSMiddleware,
@@ -47,26 +103,6 @@ def create_app() -> FastAPI:
     if settings.prometheus_enabled:
         app.add_middleware(MetricsMiddleware)
 
-    # Startup event
-    @app.on_event("startup")
-    async def startup():
-        """Application startup event."""
-        logger.info(f"Starting {settings.app_name} v{settings.app_version}")
-        logger.info(f"Debug mode: {settings.debug}")
-        logger.info(f"Log level: {settings.log_level}")
-        if cache.is_connected():
-            logger.info("Redis cache connected")
-            api_health.set(1)
-        else:
-            logger.warning("Redis cache not available")
-            api_health.set(0)
-
-    # Shutdown event
-    @app.on_event("shutdown")
-    async def shutdown():
-        """Application shutdown event."""
-        logger.info(f"Shutting down {settings.app_name}")
-
     # Health check endpoint
     @app.get(
         "/health",
@@ -74,7 +110,7 @@ def create_app() -> FastAPI:
         summary="Health check endpoint",
         description="Returns the health status of the API"
     )
-    async def health_check():
+    async def health_check(container: Container = Depends(get_container)):
         """
         Health check endpoint returning application status.
 
@@ -82,8 +118,7 @@ def create_app() -> FastAPI:
             Health status, version, and timestamp with dependency info
         """
         logger.debug("Health check requested")
-        redis_health = cache.is_connected()
-        api_health.set(1 if redis_health else 0)
+        redis_health = await container.cache.is_connected()
         
         # Determine overall status
         status = "healthy" if redis_health else "degraded"
@@ -114,12 +149,20 @@ def create_app() -> FastAPI:
         summary="Get weather data",
         description="Fetch current weather data for a specified city"
     )
-    async def get_weather(city: str = Query(..., min_length=1, description="City name")):
+    async def get_weather(
+        request: Request,
+        city: str = Query(..., min_length=1, description="City name"),
+        units: str = Query("metric", description="Unit system: metric, imperial or standard"),
+        lang: str = Query("en", description="Language for the weather description"),
+        container: Container = Depends(get_container)
+    ):
         """
         Get weather data for a city.
 
         Args:
             city: City name to fetch weather for
+            units: Unit system for temperatures and wind speed
+            lang: Language code for the description (e.g. en, de, pt-BR)
 
         Returns:
             WeatherData: Current weather information including temperature, humidity, etc.
@@ -136,7 +179,26 @@ def create_app() -> FastAPI:
                 detail="City name cannot be empty"
             )
 
-        weather_data = await weather_service.get_weather(city)
+        if units not in UNITS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported units '{units}'. Supported: {', '.join(UNITS)}"
+            )
+
+        language = normalize_lang(lang)
+        if not language:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported language '{lang}'. Supported: {', '.join(LANGUAGES)}"
+            )
+
+        # Admission control already read the entry when it let a cache hit bypass
+        weather_data = await container.weather.get_weather(
+            city,
+            units=units,
+            lang=language,
+            cached_data=getattr(request.state, "cached_weather", None)
+        )
 
         if not weather_data:
             logger.warning(f"Weather data not found for city: {city}")
@@ -149,6 +211,37 @@ def create_app() -> FastAPI:
         logger.info(f"Successfully retrieved weather for {city}")
         return weather_data
 
+    # Bulk export endpoint - stream every cached city
+    @app.get(
+        "/weather/export",
+        tags=["Weather"],
+        summary="Export cached weather",
+        description="Stream all cached weather entries as NDJSON or MessagePack"
+    )
+    async def export_weather(
+        output: str = Query(
+            "ndjson",
+            alias="format",
+            pattern="^(ndjson|msgpack)$",
+            description="ndjson (one JSON object per line) or msgpack (concatenated maps)"
+        ),
+        container: Container = Depends(get_container)
+    ):
+        """
+        Stream the current cache contents without calling the upstream API.
+
+        Entries are canonical observations (metric, English descriptions).
+        A city may appear more than once if Redis rehashes during the export.
+        """
+        if not await container.cache.is_connected():
+            raise HTTPException(status_code=503, detail="Cache is not available")
+
+        logger.info("Cache export requested", extra={"format": output})
+        return StreamingResponse(
+            export_stream(container.cache, settings, output),
+            media_type=MEDIA_TYPES[output]
+        )
+
     # Diagnostics endpoint
     @app.get(
         "/diagnostics",
@@ -156,7 +249,7 @@ def create_app() -> FastAPI:
         summary="API diagnostics",
         description="Check API configuration and dependencies"
     )
-    async def diagnostics():
+    async def diagnostics(container: Container = Depends(get_container)):
         """
         Diagnostic endpoint to check API configuration and health.
         
@@ -170,10 +263,10 @@ def create_app() -> FastAPI:
         api_key_status = "configured" if api_key and api_key != "your_api_key_here" else "not_configured"
         
         # Check Redis
-        redis_status = cache.is_connected()
+        redis_status = await container.cache.is_connected()
         
         # Check weather service
-        weather_health = await weather_service.health_check()
+        weather_health = await container.weather.health_check()
         
         return {
             "status": "ok" if all([redis_status, weather_health if api_key_status != "not_configured" else True]) else "warning",
@@ -197,10 +290,32 @@ def create_app() -> FastAPI:
             },
             "cache": {
                 "ttl_seconds": settings.redis_cache_ttl,
-                "enabled": redis_status
-            }
+                "enabled": redis_status,
+                "memory": await container.cache.memory_report() if redis_status else {}
+            },
+            "startup": container.startup_report(),
+            "snapshot": container.snapshot.last_result,
+            "replication": container.replication.status() if container.replication else {"enabled": False}
         }
 
+    # Analytics endpoint
+    @app.get(
+        "/analytics",
+        tags=["Monitoring"],
+        summary="Traffic analytics",
+        description="Top cities, unique cities per hour and hit ratio by popularity tier"
+    )
+    async def analytics(container: Container = Depends(get_container)):
+        """
+        Probabilistic traffic analytics for this worker.
+
+        Counts come from a Count-Min Sketch and HyperLogLog with fixed memory;
+        ``unique_cities.cluster`` is merged across pods when Redis merging is enabled.
+        """
+        if not container.analytics:
+            raise HTTPException(status_code=404, detail="Analytics disabled")
+        return await container.analytics.report()
+
     # Metrics endpoint
     @app.get(
         "/metrics",
@@ -228,12 +343,31 @@ def create_app() -> FastAPI:
         "/cache",
         tags=["Cache"],
         summary="Clear cache",
-        description="Clear all cached weather data"
+        description="Invalidate all cached weather data, or only a city / glob pattern in the background"
     )
-    async def clear_cache():
-        """Clear all cached data."""
+    async def clear_cache(
+        city: Optional[str] = Query(None, min_length=1, description="Invalidate a single city"),
+        pattern: Optional[str] = Query(None, min_length=1, description="Glob pattern over city names, e.g. 'lon*'"),
+        container: Container = Depends(get_container)
+    ):
+        """
+        Invalidate cached data.
+
+        Without parameters all entries are invalidated in O(1) by bumping the
+        cache generation. With ``city`` or ``pattern`` a background SCAN + UNLINK
+        job is started and its id returned for progress polling.
+        """
+        if city or pattern:
+            match = escape_glob(cache_key(city)) if city else f"weather:{pattern.lower()}"
+            logger.info(f"Cache invalidation requested for pattern: {match}")
+            job = await container.invalidation.start(match)
+            if not job:
+                logger.error("Failed to start cache invalidation")
+                raise HTTPException(status_code=500, detail="Failed to start cache invalidation")
+            return JSONResponse(status_code=202, content=job.model_dump())
+
         logger.info("Cache clear requested")
-        success = await cache.clear()
+        success = await container.cache.clear()
         if success:
             logger.info("Cache cleared successfully")
             return {"message": "Cache cleared successfully"}
@@ -241,6 +375,100 @@ def create_app() -> FastAPI:
             logger.error("Failed to clear cache")
             raise HTTPException(status_code=500, detail="Failed to clear cache")
 
+    @app.get(
+        "/cache/jobs/{job_id}",
+        response_model=InvalidationJob,
+        tags=["Cache"],
+        summary="Invalidation job status",
+        description="Report progress of a background cache invalidation job"
+    )
+    async def cache_job(job_id: str, container: Container = Depends(get_container)):
+        """Return progress of a cache invalidation job."""
+        job = await container.invalidation.get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail=f"Invalidation job '{job_id}' not found")
+        return job
+
+    # Debug endpoints
+    def check_debug_token(token: Optional[str]):
+        """Reject requests without the configured ``X-Debug-Token``."""
+        if settings.debug_token and not secrets.compare_digest(token or "", settings.debug_token):
+            raise HTTPException(status_code=403, detail="Invalid debug token")
+
+    @app.get(
+        "/debug/loop",
+        tags=["Diagnostics"],
+        summary="Event loop health",
+        description="Event loop lag summary and recent stall reports with stacks"
+    )
+    async def debug_loop(
+        x_debug_token: Optional[str] = Header(None),
+        container: Container = Depends(get_container)
+    ):
+        """
+        Return event loop lag and stall reports for this worker.
+
+        Stall stacks expose source paths, so they are only included when
+        ``debug_token`` is configured and sent in ``X-Debug-Token``.
+        """
+        if not settings.loop_monitor_enabled:
+            raise HTTPException(status_code=404, detail="Event loop monitor disabled")
+        check_debug_token(x_debug_token)
+        return container.loop_monitor.report(include_stacks=bool(settings.debug_token))
+
+    @app.get(
+        "/debug/profile",
+        tags=["Diagnostics"],
+        summary="Profile this worker",
+        description="Sample CPU stacks or trace allocations of the worker serving the request"
+    )
+    async def debug_profile(
+        seconds: float = Query(5, gt=0, description="Profiling duration in seconds"),
+        mode: str = Query("cpu", pattern="^(cpu|alloc)$", description="cpu (stack sampling) or alloc (tracemalloc)"),
+        output: str = Query(
+            "collapsed",
+            alias="format",
+            pattern="^(collapsed|speedscope)$",
+            description="Output format for cpu mode"
+        ),
+        top: int = Query(25, ge=1, le=200, description="Allocation sites returned in alloc mode"),
+        x_debug_token: Optional[str] = Header(None),
+        container: Container = Depends(get_container)
+    ):
+        """
+        Profile the worker process that serves this request.
+
+        Under multiple uvicorn workers each request lands on one process; the
+        ``X-Worker-PID`` header identifies which one was profiled.
+        """
+        if not settings.profiler_enabled:
+            raise HTTPException(status_code=404, detail="Profiler disabled")
+        check_debug_token(x_debug_token)
+
+        seconds = min(seconds, settings.profiler_max_seconds)
+        profiler = container.profiler
+        headers = {"X-Worker-PID": str(profiler.pid)}
+        logger.info("Profiling worker", extra={"mode": mode, "seconds": seconds, "pid": profiler.pid})
+
+        try:
+            if mode == "alloc":
+                allocations = await profiler.allocations(seconds, top=top)
+                return JSONResponse(
+                    content={"pid": profiler.pid, "seconds": seconds, "allocations": allocations},
+                    headers=headers
+                )
+            samples = await profiler.cpu(seconds)
+        except ProfilerBusyError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+
+        if output == "speedscope":
+            name = f"{settings.app_name} pid {profiler.pid}"
+            return JSONResponse(
+                content=speedscope(samples, profiler.sample_interval, name),
+                headers=headers
+            )
+        return PlainTextResponse(collapsed(samples), headers=headers)
+
     # Root endpoint
     @app.get(
         "/",
@@ -257,6 +485,7 @@ def create_app() -> FastAPI:
             "health": "/health",
             "weather": "/weather?city=London",
             "diagnostics": "/diagnostics",
+            "analytics": "/analytics",
             "metrics": "/metrics"
         }
 
@@ -276,13 +505,12 @@ def create_app() -> FastAPI:
     return app
 
 
-# Create application instance
-app = create_app()
-
 if __name__ == "__main__":
     import uvicorn
+    settings = get_settings()
     uvicorn.run(
-        "app.main:app",
+        "app.main:create_app",
+        factory=True,
         host=settings.host,
         port=settings.port,
         workers=settings.workers,
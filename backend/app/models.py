@@ -7,16 +7,17 @@ class WeatherData(BaseModel):
     """Weather data model."""
 
     city: str = Field(..., description="City name")
-    temperature: float = Field(..., description="Temperature in Celsius")
-    description: str = Field(..., description="Weather description")
+    temperature: float = Field(..., description="Temperature in °C (metric), °F (imperial) or K (standard)")
+    description: str = Field(..., description="Weather description in the requested language")
     cloudProvider: str = Field(default="AWS", description="Cloud provider (AWS or Azure)")
     isFailover: bool = Field(default=False, description="Whether using failover/secondary region")
     lastUpdated: str = Field(..., description="Last update timestamp in ISO format")
-    feels_like: float = Field(..., description="Feels like temperature in Celsius")
+    feels_like: float = Field(..., description="Feels like temperature in the same unit as temperature")
     humidity: int = Field(..., description="Humidity percentage")
     pressure: int = Field(..., description="Pressure in hPa")
-    wind_speed: float = Field(..., description="Wind speed in m/s")
+    wind_speed: float = Field(..., description="Wind speed in m/s (metric, standard) or mph (imperial)")
     cloudiness: int = Field(..., description="Cloudiness percentage")
+    units: str = Field(default="metric", description="Unit system: metric, imperial or standard")
 
     class Config:
         json_schema_extra = {
@@ -31,7 +32,8 @@ class WeatherData(BaseModel):
                 "humidity": 72,
                 "pressure": 1013,
                 "wind_speed": 3.5,
-                "cloudiness": 85
+                "cloudiness": 85,
+                "units": "metric"
             }
         }
 
@@ -59,3 +61,30 @@ class ErrorResponse(BaseModel):
     error: str = Field(..., description="Error message")
     code: str = Field(..., description="Error code")
     timestamp: str = Field(..., description="Timestamp in ISO format")
+
+
+class InvalidationJob(BaseModel):
+    """Background cache invalidation job status model."""
+
+    id: str = Field(..., description="Job identifier")
+    pattern: str = Field(..., description="Glob pattern matched against cached city keys")
+    status: str = Field(default="pending", description="pending, running, completed, failed or cancelled")
+    batches: int = Field(default=0, description="SCAN batches processed")
+    deleted: int = Field(default=0, description="Keys unlinked so far")
+    started_at: str = Field(..., description="Start timestamp in ISO format")
+    finished_at: Optional[str] = Field(default=None, description="Finish timestamp in ISO format")
+    error: Optional[str] = Field(default=None, description="Error message if the job failed")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": "3f9c1a2b7d4e",
+                "pattern": "weather:lon*",
+                "status": "running",
+                "batches": 4,
+                "deleted": 37,
+                "started_at": "2024-01-15T10:30:00",
+                "finished_at": None,
+                "error": None
+            }
+        }
@@ -0,0 +1,268 @@
+"""Memory-bounded traffic analytics using probabilistic data structures."""
+import hashlib
+import heapq
+import math
+import os
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+from app.config import Settings
+from app.services.cache import CacheService
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Popularity tiers by estimated lookup count, most popular first
+TIERS: Tuple[Tuple[str, int], ...] = (("head", 100), ("torso", 10), ("tail", 0))
+
+# Cities buffered between Redis HyperLogLog flushes, across all hours
+MAX_PENDING_CITIES = 10000
+# Hours of buffered cities kept while Redis is unreachable (the report window)
+PENDING_WINDOW_HOURS = 24
+HLL_KEY_TTL = 48 * 3600
+CLUSTER_REPORT_TTL = 300
+
+_MASK64 = (1 << 64) - 1
+
+
+def _hash(key: str) -> Tuple[int, int]:
+    """Two independent 64-bit hashes of a key, stable across processes."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+class CountMinSketch:
+    """Count-Min Sketch over ``depth`` rows of ``width`` counters."""
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.rows = [array("Q", bytes(8 * width)) for _ in range(depth)]
+
+    def add(self, hashes: Tuple[int, int], count: int = 1) -> int:
+        """Add to a key's count and return its new estimate."""
+        h1, h2 = hashes
+        estimate = None
+        for i, row in enumerate(self.rows):
+            index = (h1 + i * h2) % self.width
+            row[index] += count
+            estimate = row[index] if estimate is None else min(estimate, row[index])
+        return estimate
+
+    def estimate(self, hashes: Tuple[int, int]) -> int:
+        """Estimated count for a key (never underestimates)."""
+        h1, h2 = hashes
+        return min(row[(h1 + i * h2) % self.width] for i, row in enumerate(self.rows))
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(row.itemsize * len(row) for row in self.rows)
+
+
+class TopK:
+    """Heavy hitters tracked against Count-Min estimates with a min-heap."""
+
+    def __init__(self, k: int = 20):
+        self.k = k
+        self.counts: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []
+
+    def update(self, key: str, estimate: int):
+        """Offer a key with its current estimate."""
+        if key in self.counts or len(self.counts) < self.k:
+            self.counts[key] = estimate
+            heapq.heappush(self._heap, (estimate, key))
+        else:
+            floor_count, floor_key = self._floor()
+            if estimate <= floor_count:
+                return
+            heapq.heappop(self._heap)
+            del self.counts[floor_key]
+            self.counts[key] = estimate
+            heapq.heappush(self._heap, (estimate, key))
+
+        # Drop stale heap entries so the heap stays O(k)
+        if len(self._heap) > 4 * self.k:
+            self._heap = [(count, key) for key, count in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _floor(self) -> Tuple[int, str]:
+        while True:
+            count, key = self._heap[0]
+            if self.counts.get(key) == count:
+                return count, key
+            heapq.heappop(self._heap)
+
+    def items(self) -> List[Tuple[str, int]]:
+        """Tracked keys by descending estimate."""
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+
+
+class HyperLogLog:
+    """HyperLogLog cardinality estimator with ``2 ** precision`` registers."""
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(self.size)
+        self._alpha = 0.7213 / (1 + 1.079 / self.size)
+
+    def add(self, hashes: Tuple[int, int]):
+        h = hashes[0]
+        index = h >> (64 - self.precision)
+        remainder = (h << self.precision) & _MASK64
+        rank = min(64 - remainder.bit_length(), 64 - self.precision) + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        """Estimated number of distinct keys added."""
+        estimate = self._alpha * self.size ** 2 / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.size and zeros:
+            estimate = self.size * math.log(self.size / zeros)
+        return int(round(estimate))
+
+    @property
+    def std_error(self) -> float:
+        return 1.04 / math.sqrt(self.size)
+
+
+class TrafficAnalytics:
+    """
+    Tracks city popularity, hourly unique cities and hit ratio by tier.
+
+    Memory is fixed by configuration regardless of how many distinct
+    cities are requested. Per-worker structures can optionally be merged
+    across pods through Redis HyperLogLogs (``PFADD`` / ``PFMERGE``).
+    """
+
+    def __init__(self, settings: Settings, cache: Optional[CacheService] = None):
+        """Initialize analytics structures."""
+        self.settings = settings
+        self.cache = cache
+        self.started_at = datetime.utcnow()
+        self.total_lookups = 0
+        self.sketch = CountMinSketch(settings.analytics_cms_width, settings.analytics_cms_depth)
+        self.top = TopK(settings.analytics_top_k)
+        self.hour = self._hour_bucket(self.started_at)
+        self.hourly = HyperLogLog(settings.analytics_hll_precision)
+        self.previous_hour_unique: Optional[int] = None
+        self.tier_counts = {tier: {"hits": 0, "misses": 0} for tier, _ in TIERS}
+        self._pending: Dict[str, Set[str]] = {}
+        self._pending_count = 0
+
+    @staticmethod
+    def _hour_bucket(moment: datetime) -> str:
+        return moment.strftime("%Y%m%d%H")
+
+    def _hll_key(self, hour: str) -> str:
+        return f"{self.settings.redis_key_prefix}:analytics:hll:{hour}"
+
+    @staticmethod
+    def tier(estimate: int) -> str:
+        """Popularity tier for an estimated lookup count."""
+        for name, threshold in TIERS:
+            if estimate >= threshold:
+                return name
+        return TIERS[-1][0]
+
+    def record(self, city: str, hit: bool):
+        """Record one ``/weather`` lookup."""
+        key = city.strip().lower()
+        hashes = _hash(key)
+        self.total_lookups += 1
+
+        estimate = self.sketch.add(hashes)
+        self.top.update(key, estimate)
+        self.tier_counts[self.tier(estimate)]["hits" if hit else "misses"] += 1
+
+        now = datetime.utcnow()
+        hour = self._hour_bucket(now)
+        if hour != self.hour:
+            self.previous_hour_unique = self.hourly.count()
+            self.hourly = HyperLogLog(self.settings.analytics_hll_precision)
+            self.hour = hour
+            self._drop_stale_pending(now)
+        self.hourly.add(hashes)
+
+        if self.settings.analytics_redis_merge and self._pending_count < MAX_PENDING_CITIES:
+            pending = self._pending.setdefault(hour, set())
+            if key not in pending:
+                pending.add(key)
+                self._pending_count += 1
+
+    def _drop_stale_pending(self, now: datetime):
+        """Forget buffered hours that have left the report window."""
+        oldest = self._hour_bucket(now - timedelta(hours=PENDING_WINDOW_HOURS))
+        for hour in [hour for hour in self._pending if hour < oldest]:
+            self._pending_count -= len(self._pending.pop(hour))
+
+    async def flush(self):
+        """Push buffered cities into the shared per-hour Redis HyperLogLogs."""
+        if not self._pending or not self.cache or not self.cache.client:
+            return
+
+        pending, self._pending = self._pending, {}
+        self._pending_count = 0
+        try:
+            pipe = self.cache.client.pipeline(transaction=False)
+            for hour, cities in pending.items():
+                pipe.pfadd(self._hll_key(hour), *cities)
+                pipe.expire(self._hll_key(hour), HLL_KEY_TTL)
+            await pipe.execute()
+        except Exception as e:
+            logger.error("Analytics flush error", extra={"error": str(e)})
+
+    async def _cluster_unique(self) -> Dict[str, Optional[int]]:
+        if not self.settings.analytics_redis_merge or not self.cache or not self.cache.client:
+            return {"current_hour": None, "last_24h": None}
+
+        try:
+            now = datetime.utcnow()
+            hours = [self._hll_key(self._hour_bucket(now - timedelta(hours=i))) for i in range(24)]
+            day_key = f"{self.settings.redis_key_prefix}:analytics:hll:last24h"
+            pipe = self.cache.client.pipeline(transaction=False)
+            pipe.pfcount(hours[0])
+            pipe.pfmerge(day_key, *hours)
+            pipe.expire(day_key, CLUSTER_REPORT_TTL)
+            pipe.pfcount(day_key)
+            current, _, _, day = await pipe.execute()
+            return {"current_hour": current, "last_24h": day}
+        except Exception as e:
+            logger.error("Analytics cluster report error", extra={"error": str(e)})
+            return {"current_hour": None, "last_24h": None}
+
+    async def report(self) -> Dict[str, Any]:
+        """Analytics summary for the ``/analytics`` endpoint."""
+        await self.flush()
+        tiers = {}
+        for tier, counts in self.tier_counts.items():
+            lookups = counts["hits"] + counts["misses"]
+            tiers[tier] = {
+                **counts,
+                "hit_ratio": round(counts["hits"] / lookups, 4) if lookups else None
+            }
+
+        return {
+            "pid": os.getpid(),
+            "since": self.started_at.isoformat(),
+            "total_lookups": self.total_lookups,
+            "top_cities": [
+                {"city": city, "estimated_count": count}
+                for city, count in self.top.items()
+            ],
+            "unique_cities": {
+                "current_hour": self.hourly.count(),
+                "previous_hour": self.previous_hour_unique,
+                "cluster": await self._cluster_unique()
+            },
+            "hit_ratio_by_tier": tiers,
+            "tier_thresholds": dict(TIERS),
+            "accuracy": {
+                "cms_epsilon": round(math.e / self.sketch.width, 6),
+                "cms_delta": round(math.exp(-self.sketch.depth), 6),
+                "hll_std_error": round(self.hourly.std_error, 4)
+            },
+            "memory_bytes": self.sketch.memory_bytes + self.hourly.size
+        }
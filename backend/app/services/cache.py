@@ -1,10 +1,20 @@
 """Redis caching service."""
-import redis
-import json
-from typing import Optional, Any
-from app.config import settings
+import asyncio
+import redis.asyncio as redis
+import time
+from collections import OrderedDict
+from typing import Optional, Any, Dict, List, Tuple
+from app.config import Settings
+from app.services import codec
 from app.utils.logging import get_logger
-from app.utils.metrics import cache_hits, cache_misses
+from app.utils.metrics import (
+    cache_hits,
+    cache_misses,
+    api_health,
+    cache_write_behind_depth,
+    cache_write_behind_flush_duration,
+    cache_write_behind_dropped,
+)
 
 logger = get_logger(__name__)
 
@@ -12,36 +22,162 @@ logger = get_logger(__name__)
 class CacheService:
     """Redis cache service for caching weather data."""
 
-    def __init__(self):
-        """Initialize Redis connection."""
+    def __init__(self, settings: Settings):
+        """
+        Initialize cache service.
+
+        No connection is made here; call ``connect()`` (usually from the
+        application lifespan) to establish it.
+        """
+        self.settings = settings
+        self.client: Optional[redis.Redis] = None
+        self._connect_lock = asyncio.Lock()
+        self._generation: Optional[int] = None
+        self._generation_checked = 0.0
+        # Write-behind queue: logical key -> (encoded value, ttl), oldest first
+        self._pending: "OrderedDict[str, Tuple[bytes, int]]" = OrderedDict()
+        # Entries taken off the queue whose pipeline has not completed yet
+        self._in_flight: Dict[str, Tuple[bytes, int]] = {}
+        self._pending_event = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def _create_client(self) -> redis.Redis:
+        return redis.Redis(
+            host=self.settings.redis_host,
+            port=self.settings.redis_port,
+            db=self.settings.redis_db,
+            password=self.settings.redis_password,
+            decode_responses=False,
+            socket_connect_timeout=5,
+            socket_keepalive=True
+        )
+
+    async def connect(self, retries: Optional[int] = None) -> bool:
+        """
+        Connect to Redis, retrying with exponential backoff.
+
+        Args:
+            retries: Number of attempts (defaults to ``redis_connect_retries``)
+
+        Returns:
+            True once connected, False if every attempt failed
+        """
+        retries = retries or self.settings.redis_connect_retries
+        async with self._connect_lock:
+            if self.client:
+                return True
+
+            for attempt in range(1, retries + 1):
+                client = self._create_client()
+                try:
+                    await client.ping()
+                    self.client = client
+                    api_health.set(1)
+                    logger.info("Redis connection established", extra={
+                        "host": self.settings.redis_host,
+                        "attempt": attempt
+                    })
+                    return True
+                except Exception as e:
+                    await client.aclose()
+                    logger.warning(
+                        "Failed to connect to Redis",
+                        extra={
+                            "error_type": type(e).__name__,
+                            "error": str(e),
+                            "host": self.settings.redis_host,
+                            "port": self.settings.redis_port,
+                            "attempt": attempt
+                        }
+                    )
+                    if attempt < retries:
+                        await asyncio.sleep(self.settings.redis_connect_backoff * 2 ** (attempt - 1))
+
+            api_health.set(0)
+            return False
+
+    def start(self):
+        """Start the write-behind flusher task."""
+        if not self._flusher:
+            self._stopping = False
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Flush pending writes and close the Redis connection pool."""
+        if self._flusher:
+            # Let the flusher finish its in-flight batch instead of cancelling it
+            self._stopping = True
+            self._pending_event.set()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
         try:
-            self.client = redis.Redis(
-                host=settings.redis_host,
-                port=settings.redis_port,
-                db=settings.redis_db,
-                password=settings.redis_password,
-                decode_responses=True,
-                socket_connect_timeout=5,
-                socket_keepalive=True
-            )
-            # Test connection
-            self.client.ping()
-            logger.info("Redis connection established", extra={"host": settings.redis_host})
+            await self.flush()
         except Exception as e:
-            logger.error("Failed to connect to Redis", extra={"error": str(e)})
+            logger.error("Final write-behind flush failed", extra={"error": str(e)})
+        if self.client:
+            await self.client.aclose()
             self.client = None
 
+    @property
+    def generation_key(self) -> str:
+        """Redis key holding the current cache generation counter."""
+        return f"{self.settings.redis_key_prefix}:generation"
+
+    async def generation(self) -> int:
+        """
+        Return the current cache generation.
+
+        The counter is re-read from Redis at most every
+        ``cache_generation_refresh_seconds`` so other workers pick up a
+        bump without paying an extra round trip on every lookup.
+        """
+        now = time.monotonic()
+        if (
+            self._generation is None
+            or now - self._generation_checked >= self.settings.cache_generation_refresh_seconds
+        ):
+            value = await self.client.get(self.generation_key)
+            self._generation = int(value) if value else 0
+            self._generation_checked = now
+        return self._generation
+
+    async def namespaced(self, key: str) -> str:
+        """Prefix a logical key (or SCAN pattern) with the current generation."""
+        return f"{self.settings.redis_key_prefix}:g{await self.generation()}:{key}"
+
+    async def lookup_keys(self, key: str) -> List[str]:
+        """
+        Redis keys a logical key (or SCAN pattern) may be stored under.
+
+        Until the cache is first cleared (generation 0), entries written by
+        releases before generation namespacing are still read from their
+        unprefixed keys so upgrading does not start with a cold cache.
+        """
+        namespaced = await self.namespaced(key)
+        return [namespaced, key] if self._generation == 0 else [namespaced]
+
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache."""
+        pending = self._pending.get(key) or self._in_flight.get(key)
+        if pending:
+            cache_hits.labels(key=key).inc()
+            return codec.decode(pending[0])
+
         if not self.client:
             return None
 
         try:
-            value = self.client.get(key)
+            values = await self.client.mget(await self.lookup_keys(key))
+            value = next((value for value in values if value), None)
             if value:
                 cache_hits.labels(key=key).inc()
                 logger.debug(f"Cache hit for key: {key}")
-                return json.loads(value)
+                decoded = codec.decode(value)
+                if codec.is_replica(value) and isinstance(decoded, dict):
+                    # Replicated from another region rather than fetched here
+                    decoded["isFailover"] = True
+                return decoded
             cache_misses.labels(key=key).inc()
             logger.debug(f"Cache miss for key: {key}")
             return None
@@ -49,6 +185,19 @@ class CacheService:
             logger.error(f"Cache get error for key {key}", extra={"error": str(e)})
             return None
 
+    async def contains(self, key: str) -> bool:
+        """Check whether a key is cached without fetching its value."""
+        if key in self._pending or key in self._in_flight:
+            return True
+        if not self.client:
+            return False
+
+        try:
+            return bool(await self.client.exists(*await self.lookup_keys(key)))
+        except Exception as e:
+            logger.error(f"Cache exists error for key {key}", extra={"error": str(e)})
+            return False
+
     async def set(
         self,
         key: str,
@@ -60,25 +209,115 @@ class CacheService:
             return False
 
         try:
-            ttl = ttl or settings.redis_cache_ttl
-            self.client.setex(
-                key,
-                ttl,
-                json.dumps(value, default=str)
-            )
+            ttl = ttl or self.settings.redis_cache_ttl
+            encoded = codec.encode(value)
+            pipe = self.client.pipeline(transaction=False)
+            pipe.setex(await self.namespaced(key), ttl, encoded)
+            self._replicate(pipe, op="set", key=key, value=encoded, ttl=ttl)
+            await pipe.execute()
             logger.debug(f"Cache set for key: {key}", extra={"ttl": ttl})
             return True
         except Exception as e:
             logger.error(f"Cache set error for key {key}", extra={"error": str(e)})
             return False
 
+    def set_behind(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None
+    ) -> bool:
+        """
+        Queue a cache write and return immediately.
+
+        Writes are coalesced per key and flushed in pipelined ``SETEX``
+        batches by a background task. When the queue is full the oldest
+        pending write is dropped.
+        """
+        if not self.client:
+            return False
+
+        try:
+            encoded = codec.encode(value)
+        except Exception as e:
+            logger.error(f"Cache encode error for key {key}", extra={"error": str(e)})
+            return False
+
+        self._pending[key] = (encoded, ttl or self.settings.redis_cache_ttl)
+        self._pending.move_to_end(key)
+        while len(self._pending) > self.settings.cache_write_behind_max_pending:
+            self._pending.popitem(last=False)
+            cache_write_behind_dropped.labels(reason="overflow").inc()
+        cache_write_behind_depth.set(len(self._pending))
+        self._pending_event.set()
+        return True
+
+    async def flush(self):
+        """Write all pending entries to Redis."""
+        while self._pending:
+            await self._flush_batch()
+
+    async def _flush_batch(self):
+        batch = []
+        while self._pending and len(batch) < self.settings.cache_write_behind_batch_size:
+            batch.append(self._pending.popitem(last=False))
+        cache_write_behind_depth.set(len(self._pending))
+
+        if not self.client:
+            cache_write_behind_dropped.labels(reason="disconnected").inc(len(batch))
+            return
+
+        # Keep the batch readable until Redis has it, so concurrent misses
+        # for these keys are still served instead of going upstream
+        self._in_flight.update(batch)
+        start_time = time.perf_counter()
+        try:
+            generation = await self.generation()
+            pipe = self.client.pipeline(transaction=False)
+            for key, (encoded, ttl) in batch:
+                pipe.setex(f"{self.settings.redis_key_prefix}:g{generation}:{key}", ttl, encoded)
+                self._replicate(pipe, op="set", key=key, value=encoded, ttl=ttl)
+            await pipe.execute()
+            logger.debug("Write-behind batch flushed", extra={"size": len(batch)})
+        except asyncio.CancelledError:
+            # Put the batch back so a later flush still writes it, unless
+            # the key was deleted or the cache cleared in the meantime
+            for key, entry in reversed(batch):
+                if key not in self._pending and self._in_flight.get(key) is entry:
+                    self._pending[key] = entry
+                    self._pending.move_to_end(key, last=False)
+            cache_write_behind_depth.set(len(self._pending))
+            raise
+        except Exception as e:
+            cache_write_behind_dropped.labels(reason="error").inc(len(batch))
+            logger.error("Write-behind flush error", extra={"error": str(e), "size": len(batch)})
+        finally:
+            for key, entry in batch:
+                if self._in_flight.get(key) is entry:
+                    del self._in_flight[key]
+            cache_write_behind_flush_duration.observe(time.perf_counter() - start_time)
+
+    async def _flush_loop(self):
+        while not self._stopping:
+            await self._pending_event.wait()
+            if not self._stopping:
+                # Give concurrent misses a moment to join the batch
+                await asyncio.sleep(self.settings.cache_write_behind_flush_interval)
+            self._pending_event.clear()
+            await self.flush()
+
     async def delete(self, key: str) -> bool:
         """Delete value from cache."""
+        self._pending.pop(key, None)
+        self._in_flight.pop(key, None)
         if not self.client:
             return False
 
         try:
-            self.client.delete(key)
+            pipe = self.client.pipeline(transaction=False)
+            pipe.unlink(*await self.lookup_keys(key))
+            self._replicate(pipe, op="delete", key=key)
+            await pipe.execute()
             logger.debug(f"Cache deleted for key: {key}")
             return True
         except Exception as e:
@@ -86,69 +325,100 @@ class CacheService:
             return False
 
     async def clear(self) -> bool:
-        """Clear all cache."""
+        """
+        Invalidate all cached data by bumping the cache generation.
+
+        Keys from older generations are no longer addressed and simply
+        expire through their TTL, so this is O(1) and leaves unrelated
+        data in the same Redis database untouched.
+        """
         if not self.client:
             return False
 
         try:
-            self.client.flushdb()
-            logger.info("Cache cleared")
+            self._pending.clear()
+            self._in_flight.clear()
+            cache_write_behind_depth.set(0)
+            pipe = self.client.pipeline(transaction=False)
+            pipe.incr(self.generation_key)
+            self._replicate(pipe, op="clear")
+            self._generation = (await pipe.execute())[0]
+            self._generation_checked = time.monotonic()
+            logger.info("Cache cleared", extra={"generation": self._generation})
             return True
         except Exception as e:
             logger.error("Cache clear error", extra={"error": str(e)})
             return False
 
-    def is_connected(self) -> bool:
-        """Check if Redis is connected. Attempts reconnection if needed."""
-        # If no client exists, try to reconnect
+    @property
+    def replication_stream_key(self) -> str:
+        """Redis stream recording cache writes for cross-region replication."""
+        return f"{self.settings.redis_key_prefix}:replication"
+
+    def _replicate(self, pipe, **fields):
+        """Append a replication event to a pipeline when peers will consume it."""
+        if not self.settings.replication_active:
+            return
+        pipe.xadd(
+            self.replication_stream_key,
+            {name: value for name, value in fields.items() if value is not None},
+            maxlen=self.settings.replication_stream_maxlen,
+            approximate=True
+        )
+
+    async def publish_invalidation(self, pattern: str):
+        """Record a pattern invalidation so peer regions apply it too."""
+        if not self.settings.replication_active or not self.client:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            self._replicate(pipe, op="pattern", key=pattern)
+            await pipe.execute()
+        except Exception as e:
+            logger.error("Failed to publish cache invalidation", extra={"error": str(e)})
+
+    async def memory_report(self, sample_size: int = 50) -> Dict[str, Any]:
+        """Report Redis memory usage and sampled per-key sizes."""
         if not self.client:
-            try:
-                logger.info(
-                    "Attempting Redis reconnection",
-                    extra={
-                        "host": settings.redis_host,
-                        "port": settings.redis_port,
-                        "has_password": settings.redis_password is not None
-                    }
-                )
-                self.client = redis.Redis(
-                    host=settings.redis_host,
-                    port=settings.redis_port,
-                    db=settings.redis_db,
-                    password=settings.redis_password,
-                    decode_responses=True,
-                    socket_connect_timeout=5,
-                    socket_keepalive=True
-                )
-                self.client.ping()
-                logger.info("Redis reconnected successfully", extra={"host": settings.redis_host})
-                return True
-            except ConnectionRefusedError as e:
-                logger.warning(
-                    "Redis connection refused - ensure Redis is running",
-                    extra={
-                        "host": settings.redis_host,
-                        "port": settings.redis_port,
-                        "error": str(e)
-                    }
-                )
-                self.client = None
-                return False
-            except Exception as e:
-                logger.warning(
-                    "Failed to reconnect to Redis",
-                    extra={
-                        "error_type": type(e).__name__,
-                        "error": str(e),
-                        "host": settings.redis_host
-                    }
-                )
-                self.client = None
+            return {}
+
+        try:
+            info = await self.client.info("memory")
+            keys = []
+            match = await self.namespaced("weather:*")
+            async for key in self.client.scan_iter(match=match, count=sample_size):
+                keys.append(key)
+                if len(keys) >= sample_size:
+                    break
+
+            pipe = self.client.pipeline(transaction=False)
+            for key in keys:
+                pipe.memory_usage(key)
+            sizes = [size for size in await pipe.execute() if size]
+
+            return {
+                "used_memory_bytes": info.get("used_memory"),
+                "maxmemory_bytes": info.get("maxmemory"),
+                "keys": await self.client.dbsize(),
+                "generation": await self.generation(),
+                "sampled_keys": len(sizes),
+                "avg_key_bytes": round(sum(sizes) / len(sizes), 1) if sizes else None,
+                "max_key_bytes": max(sizes) if sizes else None
+            }
+        except Exception as e:
+            logger.error("Cache memory report error", extra={"error": str(e)})
+            return {}
+
+    async def is_connected(self) -> bool:
+        """Check if Redis is connected. Attempts a single reconnection if needed."""
+        if not self.client:
+            if self._connect_lock.locked():
+                # A connection attempt is already in flight
                 return False
-        
-        # If client exists, test connection
+            return await self.connect(retries=1)
+
         try:
-            self.client.ping()
+            await self.client.ping()
             return True
         except Exception as e:
             logger.warning(
@@ -158,9 +428,7 @@ class CacheService:
                     "error": str(e)
                 }
             )
-            self.client = None
+            client, self.client = self.client, None
+            await client.aclose()
+            api_health.set(0)
             return False
-
-
-# Global cache instance
-cache = CacheService()
@@ -0,0 +1,112 @@
+"""Versioned binary codec for Redis cache values.
+
+Encoded values start with a 4-byte header: the ``WT`` magic, a format
+version and a flags byte. Values without the magic are legacy JSON entries
+written by earlier releases and are still decoded transparently.
+"""
+import json
+from typing import Any, Dict, Tuple
+
+import msgpack
+
+from app.utils.metrics import cache_codec_decodes
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+MAGIC = b"WT"
+VERSION = 1
+HEADER_SIZE = 4
+
+# Flags
+FLAG_ZSTD = 0x01
+FLAG_SCHEMA = 0x02
+FLAG_REPLICA = 0x04  # written by cross-region replication, not a local fetch
+
+# Frozen positional layouts for known payloads. Never reorder or edit an
+# existing entry; add a new schema id when the cached shape changes.
+SCHEMAS: Dict[int, Tuple[str, ...]] = {
+    1: (
+        "city", "temperature", "description", "cloudProvider", "isFailover",
+        "lastUpdated", "feels_like", "humidity", "pressure", "wind_speed",
+        "cloudiness",
+    ),
+}
+_SCHEMA_IDS = {fields: schema_id for schema_id, fields in SCHEMAS.items()}
+
+COMPRESS_MIN_BYTES = 1024
+
+if zstandard is not None:
+    _compressor = zstandard.ZstdCompressor(level=3)
+    _decompressor = zstandard.ZstdDecompressor()
+
+
+class CodecError(ValueError):
+    """Raised when a cached value cannot be decoded."""
+
+
+def encode(value: Any) -> bytes:
+    """Encode a value into the compact binary cache format."""
+    flags = 0
+    fields = tuple(value) if isinstance(value, dict) else None
+    schema_id = _SCHEMA_IDS.get(fields) if fields else None
+
+    if schema_id is not None:
+        flags |= FLAG_SCHEMA
+        payload = msgpack.packb(
+            [schema_id, [value[field] for field in fields]],
+            default=str
+        )
+    else:
+        payload = msgpack.packb(value, default=str)
+
+    if zstandard is not None and len(payload) >= COMPRESS_MIN_BYTES:
+        flags |= FLAG_ZSTD
+        payload = _compressor.compress(payload)
+
+    return MAGIC + bytes((VERSION, flags)) + payload
+
+
+def is_replica(raw: bytes) -> bool:
+    """Whether an encoded value was written by cross-region replication."""
+    return raw.startswith(MAGIC) and len(raw) >= HEADER_SIZE and bool(raw[3] & FLAG_REPLICA)
+
+
+def mark_replica(raw: bytes) -> bytes:
+    """Set the replica flag on an encoded value; legacy JSON is returned as is."""
+    if not raw.startswith(MAGIC) or len(raw) < HEADER_SIZE:
+        return raw
+    return raw[:3] + bytes((raw[3] | FLAG_REPLICA,)) + raw[HEADER_SIZE:]
+
+
+def decode(raw: bytes) -> Any:
+    """Decode a cached value, accepting both binary and legacy JSON entries."""
+    if not raw.startswith(MAGIC):
+        cache_codec_decodes.labels(format="legacy_json").inc()
+        return json.loads(raw)
+
+    if len(raw) < HEADER_SIZE:
+        raise CodecError("Truncated cache value header")
+
+    version, flags = raw[2], raw[3]
+    if version != VERSION:
+        raise CodecError(f"Unsupported cache value version: {version}")
+
+    payload = raw[HEADER_SIZE:]
+    if flags & FLAG_ZSTD:
+        if zstandard is None:
+            raise CodecError("zstandard is required to decode this value")
+        payload = _decompressor.decompress(payload)
+
+    value = msgpack.unpackb(payload)
+    if flags & FLAG_SCHEMA:
+        schema_id, values = value
+        fields = SCHEMAS.get(schema_id)
+        if fields is None:
+            raise CodecError(f"Unknown cache value schema: {schema_id}")
+        value = dict(zip(fields, values))
+
+    cache_codec_decodes.labels(format=f"v{version}").inc()
+    return value
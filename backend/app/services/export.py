@@ -0,0 +1,94 @@
+"""Streaming bulk export of cached weather observations."""
+import json
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List
+import msgpack
+from app.config import Settings
+from app.services import codec
+from app.services.cache import CacheService
+from app.utils.logging import get_logger
+from app.utils.metrics import cache_export_entries
+
+logger = get_logger(__name__)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "msgpack": "application/x-msgpack",
+}
+
+
+def _ndjson(record: Dict[str, Any]) -> bytes:
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False, default=str).encode() + b"\n"
+
+
+def _msgpack(record: Dict[str, Any]) -> bytes:
+    return msgpack.packb(record, default=str)
+
+
+ENCODERS: Dict[str, Callable[[Dict[str, Any]], bytes]] = {
+    "ndjson": _ndjson,
+    "msgpack": _msgpack,
+}
+
+
+async def iter_cached_weather(cache: CacheService, chunk_size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yield current-generation weather entries in chunks.
+
+    Keys are walked with ``SCAN`` and fetched with one ``MGET`` per batch,
+    so memory is bounded by ``chunk_size``. ``SCAN`` may return a key more
+    than once while Redis rehashes; entries expiring mid-walk are skipped.
+    """
+    await cache.flush()
+    prefix = await cache.namespaced("")
+    cursor = 0
+    while True:
+        cursor, keys = await cache.client.scan(cursor=cursor, match=f"{prefix}weather:*", count=chunk_size)
+        if keys:
+            records = []
+            for key, value in zip(keys, await cache.client.mget(keys)):
+                if value is None:
+                    continue
+                try:
+                    record = codec.decode(value)
+                except Exception as e:
+                    logger.warning("Skipping undecodable cache entry", extra={"key": key.decode(), "error": str(e)})
+                    continue
+                if codec.is_replica(value):
+                    record["isFailover"] = True
+                records.append(record)
+            if records:
+                yield records
+        if cursor == 0:
+            break
+
+
+async def export_stream(cache: CacheService, settings: Settings, output: str = "ndjson") -> AsyncIterator[bytes]:
+    """
+    Encode cached weather as NDJSON lines or concatenated MessagePack maps.
+
+    One encoded chunk is yielded per Redis batch; the next batch is only
+    read once the response has sent the previous one, so a slow client
+    holds at most one chunk in memory. Never calls the upstream API.
+    """
+    encode = ENCODERS[output]
+    exported = 0
+    start_time = time.perf_counter()
+    try:
+        async for records in iter_cached_weather(cache, settings.cache_export_chunk_size):
+            yield b"".join(
+                encode({**record, "cloudProvider": settings.cloud_provider})
+                for record in records
+            )
+            exported += len(records)
+            cache_export_entries.labels(format=output).inc(len(records))
+    except Exception as e:
+        # Headers are already sent; aborting the stream tells the client it is incomplete
+        logger.error("Cache export failed", extra={"exported": exported, "error": str(e)})
+        raise
+    finally:
+        logger.info("Cache export finished", extra={
+            "format": output,
+            "entries": exported,
+            "duration": time.perf_counter() - start_time
+        })
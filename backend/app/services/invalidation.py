@@ -0,0 +1,133 @@
+"""Targeted background cache invalidation using SCAN + UNLINK batches."""
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Optional, Set, Tuple
+from app.config import Settings
+from app.models import InvalidationJob
+from app.services.cache import CacheService
+from app.utils.logging import get_logger
+from app.utils.metrics import cache_invalidated_keys
+
+logger = get_logger(__name__)
+
+# Seconds between batches so a large invalidation never monopolizes Redis
+BATCH_PAUSE = 0.01
+# How long finished job status stays queryable
+JOB_STATUS_TTL = 3600
+
+_GLOB_SPECIAL = "\\*?[]"
+
+
+def escape_glob(value: str) -> str:
+    """Escape Redis glob metacharacters so a value matches literally."""
+    return "".join(f"\\{char}" if char in _GLOB_SPECIAL else char for char in value)
+
+
+async def scan_unlink_batch(client, match: str, cursor: int, count: int) -> Tuple[int, int]:
+    """Run one SCAN step and UNLINK its matches; returns (next cursor, deleted)."""
+    cursor, keys = await client.scan(cursor=cursor, match=match, count=count)
+    deleted = await client.unlink(*keys) if keys else 0
+    return cursor, deleted
+
+
+class InvalidationService:
+    """Runs pattern invalidation jobs in the background and tracks progress."""
+
+    def __init__(self, settings: Settings, cache_service: CacheService):
+        """Initialize invalidation service."""
+        self.settings = settings
+        self.cache = cache_service
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.settings.redis_key_prefix}:jobs:{job_id}"
+
+    async def start(self, pattern: str) -> Optional[InvalidationJob]:
+        """
+        Start invalidating all current-generation keys matching a pattern.
+
+        Args:
+            pattern: Glob pattern over logical keys, e.g. ``weather:lon*``
+
+        Returns:
+            The created job, or None if Redis is unavailable
+        """
+        if not self.cache.client:
+            return None
+
+        job = InvalidationJob(
+            id=uuid.uuid4().hex[:12],
+            pattern=pattern,
+            started_at=datetime.utcnow().isoformat()
+        )
+        await self._save(job)
+        await self.cache.publish_invalidation(pattern)
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        logger.info("Cache invalidation job started", extra={"job_id": job.id, "pattern": pattern})
+        return job
+
+    async def close(self):
+        """Cancel jobs still running at shutdown."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def get(self, job_id: str) -> Optional[InvalidationJob]:
+        """Look up job progress; works from any worker sharing the Redis."""
+        if not self.cache.client:
+            return None
+
+        data = await self.cache.client.hgetall(self._job_key(job_id))
+        if not data:
+            return None
+        fields = {k.decode(): v.decode() for k, v in data.items()}
+        return InvalidationJob(**{k: (v or None) for k, v in fields.items()})
+
+    async def _save(self, job: InvalidationJob):
+        key = self._job_key(job.id)
+        mapping = {k: "" if v is None else str(v) for k, v in job.model_dump().items()}
+        pipe = self.cache.client.pipeline(transaction=False)
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, JOB_STATUS_TTL)
+        await pipe.execute()
+
+    async def _run(self, job: InvalidationJob):
+        job.status = "running"
+        try:
+            for match in await self.cache.lookup_keys(job.pattern):
+                cursor = 0
+                while True:
+                    cursor, deleted = await scan_unlink_batch(
+                        self.cache.client,
+                        match,
+                        cursor,
+                        self.settings.cache_invalidation_batch_size
+                    )
+                    job.batches += 1
+                    job.deleted += deleted
+                    cache_invalidated_keys.inc(deleted)
+                    await self._save(job)
+                    if cursor == 0:
+                        break
+                    await asyncio.sleep(BATCH_PAUSE)
+            job.status = "completed"
+            logger.info("Cache invalidation job completed", extra={
+                "job_id": job.id,
+                "deleted": job.deleted
+            })
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error("Cache invalidation job failed", extra={"job_id": job.id, "error": str(e)})
+        finally:
+            job.finished_at = datetime.utcnow().isoformat()
+            try:
+                await self._save(job)
+            except Exception as e:
+                logger.error("Failed to record invalidation job", extra={"job_id": job.id, "error": str(e)})
@@ -0,0 +1,114 @@
+"""Response-time unit conversion and description translation.
+
+Observations are fetched and cached once per city in metric units with
+English descriptions. Other unit systems and languages are derived from
+that canonical entry when a response is built, so they never cost an
+extra upstream call or cache key.
+"""
+from typing import Dict, Optional, Tuple
+from app.models import WeatherData
+
+CANONICAL_UNITS = "metric"
+CANONICAL_LANG = "en"
+
+# (scale, offset) applied to canonical Celsius temperatures
+TEMPERATURE: Dict[str, Tuple[float, float]] = {
+    "metric": (1.0, 0.0),
+    "imperial": (9 / 5, 32.0),
+    "standard": (1.0, 273.15),
+}
+
+# Scale applied to canonical m/s wind speeds
+SPEED: Dict[str, float] = {
+    "metric": 1.0,
+    "imperial": 1 / 0.44704,
+    "standard": 1.0,
+}
+
+UNITS = tuple(TEMPERATURE)
+
+# OpenWeatherMap condition groups (``weather[0].main``) by language
+DESCRIPTIONS: Dict[str, Dict[str, str]] = {
+    "en": {},
+    "de": {
+        "Thunderstorm": "Gewitter", "Drizzle": "Nieselregen", "Rain": "Regen",
+        "Snow": "Schnee", "Mist": "Dunst", "Smoke": "Rauch", "Haze": "Diesig",
+        "Dust": "Staub", "Fog": "Nebel", "Sand": "Sand", "Ash": "Vulkanasche",
+        "Squall": "Sturmböen", "Tornado": "Tornado", "Clear": "Klar",
+        "Clouds": "Bewölkt",
+    },
+    "es": {
+        "Thunderstorm": "Tormenta", "Drizzle": "Llovizna", "Rain": "Lluvia",
+        "Snow": "Nieve", "Mist": "Neblina", "Smoke": "Humo", "Haze": "Calima",
+        "Dust": "Polvo", "Fog": "Niebla", "Sand": "Arena", "Ash": "Ceniza volcánica",
+        "Squall": "Turbonada", "Tornado": "Tornado", "Clear": "Despejado",
+        "Clouds": "Nublado",
+    },
+    "fr": {
+        "Thunderstorm": "Orage", "Drizzle": "Bruine", "Rain": "Pluie",
+        "Snow": "Neige", "Mist": "Brume", "Smoke": "Fumée", "Haze": "Brume sèche",
+        "Dust": "Poussière", "Fog": "Brouillard", "Sand": "Sable",
+        "Ash": "Cendres volcaniques", "Squall": "Grains", "Tornado": "Tornade",
+        "Clear": "Dégagé", "Clouds": "Nuageux",
+    },
+    "it": {
+        "Thunderstorm": "Temporale", "Drizzle": "Pioviggine", "Rain": "Pioggia",
+        "Snow": "Neve", "Mist": "Foschia", "Smoke": "Fumo", "Haze": "Caligine",
+        "Dust": "Polvere", "Fog": "Nebbia", "Sand": "Sabbia", "Ash": "Cenere vulcanica",
+        "Squall": "Burrasca", "Tornado": "Tornado", "Clear": "Sereno",
+        "Clouds": "Nuvoloso",
+    },
+    "pt": {
+        "Thunderstorm": "Trovoada", "Drizzle": "Chuvisco", "Rain": "Chuva",
+        "Snow": "Neve", "Mist": "Névoa", "Smoke": "Fumaça", "Haze": "Névoa seca",
+        "Dust": "Poeira", "Fog": "Nevoeiro", "Sand": "Areia", "Ash": "Cinza vulcânica",
+        "Squall": "Rajada", "Tornado": "Tornado", "Clear": "Céu limpo",
+        "Clouds": "Nublado",
+    },
+    "nl": {
+        "Thunderstorm": "Onweer", "Drizzle": "Motregen", "Rain": "Regen",
+        "Snow": "Sneeuw", "Mist": "Nevel", "Smoke": "Rook", "Haze": "Waas",
+        "Dust": "Stof", "Fog": "Mist", "Sand": "Zand", "Ash": "Vulkanische as",
+        "Squall": "Rukwind", "Tornado": "Tornado", "Clear": "Helder",
+        "Clouds": "Bewolkt",
+    },
+    "ja": {
+        "Thunderstorm": "雷雨", "Drizzle": "霧雨", "Rain": "雨", "Snow": "雪",
+        "Mist": "靄", "Smoke": "煙", "Haze": "煙霧", "Dust": "塵", "Fog": "霧",
+        "Sand": "砂", "Ash": "火山灰", "Squall": "スコール", "Tornado": "竜巻",
+        "Clear": "晴れ", "Clouds": "曇り",
+    },
+    "zh_cn": {
+        "Thunderstorm": "雷暴", "Drizzle": "毛毛雨", "Rain": "雨", "Snow": "雪",
+        "Mist": "薄雾", "Smoke": "烟雾", "Haze": "霾", "Dust": "浮尘", "Fog": "雾",
+        "Sand": "沙", "Ash": "火山灰", "Squall": "飑", "Tornado": "龙卷风",
+        "Clear": "晴", "Clouds": "多云",
+    },
+}
+
+LANGUAGES = tuple(DESCRIPTIONS)
+
+
+def normalize_lang(lang: str) -> Optional[str]:
+    """Supported language code for ``lang`` (e.g. ``pt-BR`` -> ``pt``), or None."""
+    code = lang.strip().lower().replace("-", "_")
+    if code in DESCRIPTIONS:
+        return code
+    base = code.split("_", 1)[0]
+    return base if base in DESCRIPTIONS else None
+
+
+def localize(weather: WeatherData, units: str = CANONICAL_UNITS, lang: str = CANONICAL_LANG) -> WeatherData:
+    """Convert a canonical observation to ``units`` and translate its description to ``lang``."""
+    if units == CANONICAL_UNITS and lang == CANONICAL_LANG:
+        return weather
+
+    scale, offset = TEMPERATURE[units]
+    speed = SPEED[units]
+    return weather.model_copy(update={
+        "units": units,
+        "temperature": round(weather.temperature * scale + offset, 2),
+        "feels_like": round(weather.feels_like * scale + offset, 2),
+        "wind_speed": round(weather.wind_speed * speed, 2),
+        "description": DESCRIPTIONS[lang].get(weather.description, weather.description),
+    })
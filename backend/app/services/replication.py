@@ -0,0 +1,334 @@
+"""Asynchronous cross-region cache replication over Redis Streams.
+
+Every cache write and invalidation in this region is appended to a local
+Redis stream (see ``CacheService._replicate``). For each peer region a
+consumer group on that stream is drained in batches and applied to the
+peer's Redis with pipelined commands. Replicated values carry the codec's
+replica flag so the peer reports them with ``isFailover``. Peers receive
+writes directly in Redis, never through their own stream, so two regions
+can replicate to each other without loops.
+
+Only one worker per region ships to a given peer at a time (a lease in the
+local Redis), so entries are applied in stream order. The peer records the
+last applied entry id, making a replayed batch a no-op.
+"""
+import asyncio
+import os
+import socket
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+import redis.asyncio as redis
+from redis.exceptions import ResponseError
+from app.config import Settings
+from app.services import codec
+from app.services.cache import CacheService
+from app.services.invalidation import scan_unlink_batch
+from app.utils.logging import get_logger
+from app.utils.metrics import (
+    cache_replication_lag,
+    cache_replication_entries,
+    cache_replication_batch_duration,
+    cache_replication_errors,
+)
+
+logger = get_logger(__name__)
+
+MAX_BACKOFF = 30.0
+
+# Take the lease if it is free, or extend it if this worker already holds it
+LEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return 1
+end
+return 0
+"""
+
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+Entry = Tuple[bytes, Dict[bytes, bytes]]
+
+
+def _entry_time(entry_id: bytes) -> float:
+    """Unix time (seconds) encoded in a stream entry id."""
+    return int(entry_id.split(b"-", 1)[0]) / 1000
+
+
+def _entry_order(entry_id: bytes) -> Tuple[int, int]:
+    """Sortable form of a stream entry id."""
+    ms, _, seq = entry_id.partition(b"-")
+    return int(ms), int(seq or 0)
+
+
+class PeerReplicator:
+    """Ships the local replication stream to one peer Redis."""
+
+    def __init__(self, settings: Settings, cache: CacheService, url: str):
+        """Initialize replicator for a peer Redis URL."""
+        self.settings = settings
+        self.cache = cache
+        self.url = url
+        parsed = urlparse(url)
+        self.name = f"{parsed.hostname}:{parsed.port or 6379}"
+        self.group = f"peer:{self.name}"
+        self.consumer = f"{socket.gethostname()}:{os.getpid()}"
+        self.client: Optional[redis.Redis] = None
+        self.leader = False
+        self.last_applied_id: Optional[str] = None
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._group_ready = False
+        self._retry_pending = True
+        self._claim_orphans = True
+        self._lease_script = None
+        self._release_script = None
+
+    def _key(self, generation: int, key: str) -> str:
+        return f"{self.settings.redis_key_prefix}:g{generation}:{key}"
+
+    @property
+    def lease_key(self) -> str:
+        """Local Redis key electing the worker that ships to this peer."""
+        return f"{self.settings.redis_key_prefix}:replication:lease:{self.name}"
+
+    @property
+    def applied_key(self) -> str:
+        """Peer Redis key holding the last entry id applied from this region."""
+        source = self.settings.cloud_provider.lower()
+        return f"{self.settings.redis_key_prefix}:replication:applied:{source}"
+
+    async def run(self):
+        """Replicate until cancelled, backing off while either side is down."""
+        backoff = self.settings.redis_connect_backoff
+        while True:
+            try:
+                if not self.cache.client:
+                    await asyncio.sleep(backoff)
+                    continue
+                if not self.client:
+                    self.client = redis.Redis.from_url(
+                        self.url,
+                        decode_responses=False,
+                        socket_connect_timeout=5,
+                        socket_keepalive=True
+                    )
+                if not await self._acquire_lease():
+                    await asyncio.sleep(self.settings.replication_lease_ms / 1000 / 2)
+                    continue
+                await self.step()
+                self.last_error = None
+                backoff = self.settings.redis_connect_backoff
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                cache_replication_errors.labels(peer=self.name).inc()
+                self.last_error = str(e)
+                self._retry_pending = True
+                logger.warning("Cache replication batch failed", extra={
+                    "peer": self.name,
+                    "error_type": type(e).__name__,
+                    "error": str(e)
+                })
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+
+    async def step(self):
+        """Read one batch from the stream and apply it to the peer."""
+        if not self._group_ready:
+            await self._ensure_group()
+
+        entries = await self._read()
+        if entries:
+            await self._apply(entries)
+        else:
+            self.lag_seconds = 0.0
+            cache_replication_lag.labels(peer=self.name).set(0)
+
+    async def _acquire_lease(self) -> bool:
+        if self._lease_script is None:
+            self._lease_script = self.cache.client.register_script(LEASE_SCRIPT)
+        held = bool(await self._lease_script(
+            keys=[self.lease_key],
+            args=[self.consumer, self.settings.replication_lease_ms],
+            client=self.cache.client
+        ))
+        if held and not self.leader:
+            logger.info("Acquired replication lease", extra={"peer": self.name, "consumer": self.consumer})
+            # Entries a previous leader read but never acknowledged come first
+            self._claim_orphans = True
+        self.leader = held
+        return held
+
+    async def _release_lease(self):
+        if not self.leader or not self.cache.client:
+            return
+        if self._release_script is None:
+            self._release_script = self.cache.client.register_script(RELEASE_SCRIPT)
+        await self._release_script(keys=[self.lease_key], args=[self.consumer], client=self.cache.client)
+        self.leader = False
+
+    async def close(self):
+        """Release the lease and close the peer connection."""
+        try:
+            await self._release_lease()
+        except Exception as e:
+            logger.warning("Failed to release replication lease", extra={"peer": self.name, "error": str(e)})
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+
+    async def _ensure_group(self):
+        try:
+            await self.cache.client.xgroup_create(
+                self.cache.replication_stream_key,
+                self.group,
+                id="$",
+                mkstream=True
+            )
+            logger.info("Created replication consumer group", extra={"peer": self.name})
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    async def _read(self) -> List[Entry]:
+        client = self.cache.client
+        stream = self.cache.replication_stream_key
+        count = self.settings.replication_batch_size
+
+        # Entries this consumer read but failed to apply
+        if self._retry_pending:
+            response = await client.xreadgroup(self.group, self.consumer, {stream: "0"}, count=count)
+            entries = response[0][1] if response else []
+            if entries:
+                return entries
+            self._retry_pending = False
+
+        # Entries left behind by a previous leader. Only the leader consumes,
+        # so everything still pending can be claimed regardless of idle time.
+        if self._claim_orphans:
+            claimed = await client.xautoclaim(
+                stream,
+                self.group,
+                self.consumer,
+                min_idle_time=0,
+                start_id="0-0",
+                count=count
+            )
+            entries = [entry for entry in claimed[1] if entry[1]]
+            if entries:
+                return entries
+            self._claim_orphans = False
+
+        response = await client.xreadgroup(
+            self.group,
+            self.consumer,
+            {stream: ">"},
+            count=count,
+            block=self.settings.replication_block_ms
+        )
+        return response[0][1] if response else []
+
+    async def _apply(self, entries: List[Entry]):
+        """
+        Apply entries to the peer in stream order.
+
+        Each pipeline also records the last entry id it covers on the peer,
+        and entries at or before the recorded id are skipped, so replaying a
+        batch (e.g. after a failed ``XACK``) never bumps the generation twice.
+        """
+        start_time = time.perf_counter()
+        generation_key = f"{self.settings.redis_key_prefix}:generation"
+        generation_raw, applied_raw = await self.client.mget(generation_key, self.applied_key)
+        generation = int(generation_raw) if generation_raw else 0
+        applied = _entry_order(applied_raw) if applied_raw else (0, 0)
+
+        pipe = self.client.pipeline(transaction=False)
+        now = time.time()
+        for entry_id, fields in entries:
+            if _entry_order(entry_id) <= applied:
+                continue
+            op = fields.get(b"op", b"").decode()
+            key = fields.get(b"key", b"").decode()
+            if op == "set":
+                # Keep the original expiry instead of restarting the TTL
+                remaining_ms = int((int(fields[b"ttl"]) - (now - _entry_time(entry_id))) * 1000)
+                if remaining_ms > 0:
+                    pipe.set(self._key(generation, key), codec.mark_replica(fields[b"value"]), px=remaining_ms)
+            elif op == "delete":
+                pipe.unlink(self._key(generation, key))
+            elif op == "clear":
+                await pipe.execute()
+                transaction = self.client.pipeline(transaction=True)
+                transaction.incr(generation_key)
+                transaction.set(self.applied_key, entry_id)
+                generation = (await transaction.execute())[0]
+                pipe = self.client.pipeline(transaction=False)
+            elif op == "pattern":
+                await pipe.execute()
+                pipe = self.client.pipeline(transaction=False)
+                cursor = None
+                while cursor != 0:
+                    cursor, _ = await scan_unlink_batch(
+                        self.client,
+                        self._key(generation, key),
+                        cursor or 0,
+                        self.settings.cache_invalidation_batch_size
+                    )
+            else:
+                logger.warning("Skipping unknown replication event", extra={"op": op, "peer": self.name})
+            pipe.set(self.applied_key, entry_id)
+            cache_replication_entries.labels(peer=self.name, op=op).inc()
+        await pipe.execute()
+
+        await self.cache.client.xack(
+            self.cache.replication_stream_key,
+            self.group,
+            *[entry_id for entry_id, _ in entries]
+        )
+
+        last_id = entries[-1][0]
+        self.last_applied_id = last_id.decode()
+        self.lag_seconds = round(max(time.time() - _entry_time(last_id), 0.0), 3)
+        cache_replication_lag.labels(peer=self.name).set(self.lag_seconds)
+        cache_replication_batch_duration.labels(peer=self.name).observe(time.perf_counter() - start_time)
+
+    def status(self) -> Dict[str, Any]:
+        """Replication state for diagnostics."""
+        return {
+            "peer": self.name,
+            "leader": self.leader,
+            "connected": self.client is not None and self.last_error is None,
+            "last_applied_id": self.last_applied_id,
+            "lag_seconds": self.lag_seconds,
+            "last_error": self.last_error
+        }
+
+
+class ReplicationService:
+    """Runs one replicator per configured peer region."""
+
+    def __init__(self, settings: Settings, cache: CacheService):
+        """Initialize replicators for ``replication_peers``."""
+        self.settings = settings
+        self.peers = [PeerReplicator(settings, cache, url) for url in settings.replication_peers]
+
+    async def close(self):
+        """Close all peer connections."""
+        for peer in self.peers:
+            await peer.close()
+
+    def status(self) -> Dict[str, Any]:
+        """Replication state for diagnostics."""
+        return {
+            "enabled": self.settings.replication_enabled,
+            "peers": [peer.status() for peer in self.peers]
+        }
@@ -0,0 +1,269 @@
+"""Cache snapshot export and warm restore across deploys.
+
+Snapshots are gzip-compressed MessagePack streams: a header map followed by
+one ``[key, remaining_ttl_ms, value]`` record per cached entry. Values are
+copied as stored (already codec-encoded), and restore subtracts the time
+elapsed since export from each TTL.
+
+Usage:
+    python -m app.services.snapshot export /var/lib/weather/cache.snap
+    python -m app.services.snapshot import /var/lib/weather/cache.snap
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import socket
+import time
+from typing import Any, Dict, List
+import msgpack
+from app.config import Settings, get_settings
+from app.services.cache import CacheService
+from app.utils.logging import get_logger, setup_logging
+from app.utils.metrics import cache_snapshot_keys, cache_snapshot_duration
+
+logger = get_logger(__name__)
+
+SNAPSHOT_VERSION = 1
+BATCH_SIZE = 500
+LOCK_POLL_INTERVAL = 0.1
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _read_batch(unpacker: msgpack.Unpacker, size: int) -> List[Any]:
+    batch = []
+    for record in unpacker:
+        batch.append(record)
+        if len(batch) >= size:
+            break
+    return batch
+
+
+async def export_snapshot(cache: CacheService, path: str, max_keys: int) -> Dict[str, Any]:
+    """
+    Stream current-generation weather entries into a snapshot file.
+
+    Keys are walked with ``SCAN`` and fetched with pipelined ``PTTL`` + ``GET``
+    in batches; the file is written to a temporary path and atomically
+    renamed so readers never see a partial snapshot.
+    """
+    start_time = time.perf_counter()
+    await cache.flush()
+    prefix = await cache.namespaced("")
+    tmp_path = f"{path}.tmp"
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    exported = 0
+    packer = msgpack.Packer()
+    fh = await asyncio.to_thread(gzip.open, tmp_path, "wb")
+    try:
+        await asyncio.to_thread(fh.write, packer.pack({
+            "version": SNAPSHOT_VERSION,
+            "exported_at_ms": _now_ms()
+        }))
+        cursor = 0
+        while exported < max_keys:
+            cursor, keys = await cache.client.scan(cursor=cursor, match=f"{prefix}weather:*", count=BATCH_SIZE)
+            keys = keys[:max_keys - exported]
+            if keys:
+                pipe = cache.client.pipeline(transaction=False)
+                for key in keys:
+                    pipe.pttl(key)
+                    pipe.get(key)
+                results = await pipe.execute()
+
+                chunk = bytearray()
+                for key, ttl_ms, value in zip(keys, results[::2], results[1::2]):
+                    if value is None or ttl_ms <= 0:
+                        continue
+                    chunk += packer.pack([key.decode()[len(prefix):], ttl_ms, value])
+                    exported += 1
+                await asyncio.to_thread(fh.write, bytes(chunk))
+            if cursor == 0:
+                break
+    except BaseException:
+        await asyncio.to_thread(fh.close)
+        os.unlink(tmp_path)
+        raise
+    await asyncio.to_thread(fh.close)
+    os.replace(tmp_path, path)
+
+    duration = time.perf_counter() - start_time
+    cache_snapshot_keys.labels(operation="export").inc(exported)
+    cache_snapshot_duration.labels(operation="export").observe(duration)
+    logger.info("Cache snapshot exported", extra={"path": path, "keys": exported, "duration": duration})
+    return {"keys": exported, "duration_ms": round(duration * 1000, 1)}
+
+
+async def restore_snapshot(cache: CacheService, path: str) -> Dict[str, Any]:
+    """
+    Bulk-load a snapshot into the current generation with pipelined writes.
+
+    Entries keep their remaining TTL; expired ones are skipped and existing
+    keys are never overwritten (``SET ... NX``), so fresher data wins.
+    """
+    start_time = time.perf_counter()
+    restored = expired = existing = 0
+    fh = await asyncio.to_thread(gzip.open, path, "rb")
+    try:
+        unpacker = msgpack.Unpacker(fh, raw=False)
+        header = await asyncio.to_thread(next, unpacker, None)
+        if not isinstance(header, dict) or header.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported cache snapshot format: {path}")
+        elapsed_ms = _now_ms() - header["exported_at_ms"]
+        prefix = await cache.namespaced("")
+
+        while True:
+            batch = await asyncio.to_thread(_read_batch, unpacker, BATCH_SIZE)
+            if not batch:
+                break
+            pipe = cache.client.pipeline(transaction=False)
+            queued = 0
+            for key, ttl_ms, value in batch:
+                remaining_ms = ttl_ms - elapsed_ms
+                if remaining_ms <= 0:
+                    expired += 1
+                    continue
+                pipe.set(f"{prefix}{key}", value, px=remaining_ms, nx=True)
+                queued += 1
+            if queued:
+                results = await pipe.execute()
+                written = sum(1 for result in results if result)
+                restored += written
+                existing += queued - written
+    finally:
+        await asyncio.to_thread(fh.close)
+
+    duration = time.perf_counter() - start_time
+    cache_snapshot_keys.labels(operation="restore").inc(restored)
+    cache_snapshot_duration.labels(operation="restore").observe(duration)
+    logger.info("Cache snapshot restored", extra={
+        "path": path,
+        "restored": restored,
+        "expired": expired,
+        "existing": existing,
+        "duration": duration
+    })
+    return {
+        "restored": restored,
+        "expired": expired,
+        "existing": existing,
+        "duration_ms": round(duration * 1000, 1)
+    }
+
+
+class SnapshotService:
+    """Coordinates periodic export and startup restore between workers."""
+
+    def __init__(self, settings: Settings, cache: CacheService):
+        """Initialize snapshot service."""
+        self.settings = settings
+        self.cache = cache
+        self.path = settings.cache_snapshot_path
+        self.last_result: Dict[str, Any] = {}
+
+    def _lock_key(self, name: str) -> str:
+        # Snapshots live on each pod's local disk, so locks are per host
+        return f"{self.settings.redis_key_prefix}:snapshot:{name}:{socket.gethostname()}"
+
+    async def restore(self) -> Dict[str, Any]:
+        """
+        Restore the snapshot once per pod before the worker reports ready.
+
+        One worker takes the restore lock and loads the file; the others wait
+        for it to finish so no worker serves cold while a restore is running,
+        then report the outcome the lock holder recorded in Redis.
+        """
+        if not self.path or not os.path.exists(self.path) or not self.cache.client:
+            return {"status": "skipped"}
+
+        lock = self._lock_key("restore")
+        result_key = self._lock_key("restore-result")
+        timeout = self.settings.cache_snapshot_restore_timeout
+        if not await self.cache.client.set(lock, os.getpid(), nx=True, px=int(timeout * 1000)):
+            self.last_result = await self._wait_for_peer(lock, result_key, timeout)
+            return self.last_result
+
+        try:
+            await self.cache.client.delete(result_key)
+            result = await restore_snapshot(self.cache, self.path)
+            self.last_result = {"status": "restored", **result}
+        except asyncio.CancelledError:
+            self.last_result = {"status": "timed_out"}
+            raise
+        except Exception as e:
+            logger.error("Cache snapshot restore failed", extra={"path": self.path, "error": str(e)})
+            self.last_result = {"status": "failed", "error": str(e)}
+        finally:
+            # Publish the outcome for workers waiting on the lock, then release it
+            pipe = self.cache.client.pipeline(transaction=False)
+            pipe.set(result_key, json.dumps(self.last_result), px=int(timeout * 2000))
+            pipe.delete(lock)
+            await pipe.execute()
+        return self.last_result
+
+    async def _wait_for_peer(self, lock: str, result_key: str, timeout: float) -> Dict[str, Any]:
+        """Wait for the worker holding the restore lock and report its outcome."""
+        deadline = time.monotonic() + timeout
+        while await self.cache.client.exists(lock):
+            if time.monotonic() >= deadline:
+                return {"status": "unknown", "reason": "peer restore still running"}
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+
+        raw = await self.cache.client.get(result_key)
+        if not raw:
+            return {"status": "unknown", "reason": "peer restore result not recorded"}
+        result = json.loads(raw)
+        status = result.pop("status", "unknown")
+        return {"status": "restored_by_peer" if status == "restored" else f"peer_{status}", **result}
+
+    async def run_periodic_export(self):
+        """Export a snapshot every ``cache_snapshot_interval`` seconds (one worker per pod)."""
+        interval = self.settings.cache_snapshot_interval
+        while True:
+            await asyncio.sleep(interval)
+            if not self.cache.client:
+                continue
+            try:
+                lock = self._lock_key("export")
+                if await self.cache.client.set(lock, os.getpid(), nx=True, px=int(interval * 1000 * 0.9)):
+                    result = await export_snapshot(self.cache, self.path, self.settings.cache_snapshot_max_keys)
+                    self.last_result = {"status": "exported", **result}
+            except Exception as e:
+                logger.error("Cache snapshot export failed", extra={"path": self.path, "error": str(e)})
+
+
+async def _run_cli(command: str, path: str, max_keys: int) -> Dict[str, Any]:
+    settings = get_settings()
+    cache = CacheService(settings)
+    if not await cache.connect():
+        raise SystemExit("Redis is not reachable")
+    try:
+        if command == "export":
+            return await export_snapshot(cache, path, max_keys or settings.cache_snapshot_max_keys)
+        return await restore_snapshot(cache, path)
+    finally:
+        await cache.close()
+
+
+def main(argv=None):
+    """Command line entry point for manual snapshot export and import."""
+    parser = argparse.ArgumentParser(description="Export or import a weather cache snapshot")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", help="Snapshot file path")
+    parser.add_argument("--max-keys", type=int, default=0, help="Export at most this many keys")
+    args = parser.parse_args(argv)
+
+    setup_logging(get_settings().log_level)
+    result = asyncio.run(_run_cli(args.command, args.path, args.max_keys))
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Adaptive cache TTLs aligned to the upstream observation cadence."""
+import time
+from typing import Any, Dict, Optional
+from app.config import Settings
+
+# OpenWeatherMap condition ids whose conditions change quickly:
+# thunderstorm (2xx), drizzle (3xx), rain (5xx), snow (6xx)
+VOLATILE_CONDITION_GROUPS = (2, 3, 5, 6)
+# Squalls and tornado
+VOLATILE_CONDITION_IDS = (771, 781)
+
+
+def is_volatile(data: Dict[str, Any], settings: Settings) -> bool:
+    """Whether an upstream payload describes rapidly changing conditions."""
+    condition_id = (data.get("weather") or [{}])[0].get("id") or 0
+    if condition_id // 100 in VOLATILE_CONDITION_GROUPS or condition_id in VOLATILE_CONDITION_IDS:
+        return True
+    wind_speed = (data.get("wind") or {}).get("speed") or 0
+    return wind_speed >= settings.cache_ttl_volatile_wind_speed
+
+
+def ttl_for_observation(
+    data: Dict[str, Any],
+    settings: Settings,
+    now: Optional[float] = None
+) -> int:
+    """
+    Compute a cache TTL for an upstream payload.
+
+    The entry expires shortly after the provider is expected to publish its
+    next observation (``dt`` + update interval + grace). Volatile conditions
+    scale the remaining lifetime down. The result is clamped to
+    ``[cache_ttl_min, redis_cache_ttl]``; payloads without ``dt`` or with
+    adaptive TTLs disabled use ``redis_cache_ttl``.
+
+    Args:
+        data: Raw OpenWeatherMap response
+        settings: Application settings
+        now: Current Unix time (defaults to ``time.time()``)
+
+    Returns:
+        TTL in seconds
+    """
+    observed_at = data.get("dt")
+    if not settings.cache_ttl_adaptive or not observed_at:
+        return settings.redis_cache_ttl
+
+    now = time.time() if now is None else now
+    ttl = observed_at + settings.openweather_update_interval + settings.cache_ttl_grace - now
+    if is_volatile(data, settings):
+        ttl *= settings.cache_ttl_volatile_factor
+
+    return int(min(max(ttl, settings.cache_ttl_min), settings.redis_cache_ttl))
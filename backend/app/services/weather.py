@@ -1,58 +1,105 @@
 """Weather API service for fetching weather data."""
 import httpx
 import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime
-from app.config import settings
+from app.config import Settings
 from app.models import WeatherData
-from app.services.cache import cache
+from app.services.analytics import TrafficAnalytics
+from app.services.cache import CacheService
+from app.services.localization import CANONICAL_LANG, CANONICAL_UNITS, localize
+from app.services.ttl import ttl_for_observation
 from app.utils.logging import get_logger
-from app.utils.metrics import weather_api_calls, weather_api_duration
+from app.utils.metrics import weather_api_calls, weather_api_duration, cache_ttl
 
 logger = get_logger(__name__)
 
 
+def cache_key(city: str) -> str:
+    """Cache key for a city's weather."""
+    return f"weather:{city.strip().lower()}"
+
+
 class WeatherService:
     """Service for fetching weather data from OpenWeatherMap API."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        settings: Settings,
+        cache: CacheService,
+        analytics: Optional[TrafficAnalytics] = None
+    ):
         """Initialize weather service."""
+        self.settings = settings
+        self.cache = cache
+        self.analytics = analytics
         self.base_url = settings.openweather_base_url
         self.api_key = settings.openweather_api_key
         self.timeout = settings.openweather_timeout
-
-    async def get_weather(self, city: str) -> Optional[WeatherData]:
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def start(self):
+        """Create the shared HTTP client used for upstream calls."""
+        if not self.client:
+            self.client = httpx.AsyncClient(timeout=self.timeout)
+
+    async def close(self):
+        """Close the shared HTTP client."""
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+
+    async def get_weather(
+        self,
+        city: str,
+        units: str = CANONICAL_UNITS,
+        lang: str = CANONICAL_LANG,
+        cached_data: Optional[Dict[str, Any]] = None
+    ) -> Optional[WeatherData]:
         """
         Fetch weather data for a city.
 
+        The cache holds one canonical (metric, English) observation per city;
+        ``units`` and ``lang`` are applied to it when the result is returned.
+
         Args:
             city: City name to fetch weather for
+            units: Unit system (metric, imperial or standard)
+            lang: Supported language code for the description
+            cached_data: Cached entry already read by the caller (see ``get_cached``)
 
         Returns:
             WeatherData object or None if failed
         """
         # Check cache first
-        cache_key = f"weather:{city.lower()}"
-        cached_data = await cache.get(cache_key)
+        key = cache_key(city)
+        if cached_data is None:
+            cached_data = await self.cache.get(key)
+        if self.analytics:
+            self.analytics.record(city, hit=bool(cached_data))
         if cached_data:
             logger.info(f"Returning cached weather data for {city}")
-            return WeatherData(**cached_data)
+            # Report the region serving the request; replicated entries carry isFailover
+            weather_data = WeatherData(**{**cached_data, "cloudProvider": self.settings.cloud_provider})
+            return localize(weather_data, units, lang)
 
         try:
             start_time = time.time()
-            weather_data = await self._fetch_from_api(city)
+            result = await self._fetch_from_api(city)
             duration = time.time() - start_time
 
-            if weather_data:
-                # Cache the result
-                await cache.set(cache_key, weather_data.dict())
+            if result:
+                weather_data, ttl = result
+                # Cache the result off the request path
+                self.cache.set_behind(key, weather_data.model_dump(exclude={"units"}), ttl=ttl)
+                cache_ttl.observe(ttl)
                 weather_api_calls.labels(city=city, status="success").inc()
                 weather_api_duration.observe(duration)
                 logger.info(f"Successfully fetched weather for {city}", extra={
                     "duration": duration,
                     "city": city
                 })
-                return weather_data
+                return localize(weather_data, units, lang)
             else:
                 weather_api_calls.labels(city=city, status="not_found").inc()
                 logger.warning(f"City not found: {city}")
@@ -69,50 +116,54 @@ class WeatherService:
             })
             return None
 
-    async def _fetch_from_api(self, city: str) -> Optional[WeatherData]:
-        """Fetch weather data from OpenWeatherMap API."""
+    async def get_cached(self, city: str) -> Optional[Dict[str, Any]]:
+        """Cached canonical entry for a city, or None on a miss."""
+        return await self.cache.get(cache_key(city))
+
+    async def _fetch_from_api(self, city: str) -> Optional[Tuple[WeatherData, int]]:
+        """Fetch weather data from OpenWeatherMap API along with its cache TTL."""
         params = {
             "q": city,
             "appid": self.api_key,
-            "units": "metric"
+            "units": CANONICAL_UNITS
         }
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/weather",
-                    params=params
-                )
-                
-                # Handle 401/403 - API key issues
-                if response.status_code == 401:
-                    logger.error("Invalid API key: Unauthorized access to OpenWeatherMap API")
-                    return None
-                if response.status_code == 403:
-                    logger.error("API key forbidden: Check API permissions and quota")
-                    return None
-                
-                # Handle 404 - City not found
-                if response.status_code == 404:
-                    logger.warning(f"City not found in OpenWeatherMap: {city}")
-                    return None
-                
-                response.raise_for_status()
-                data = response.json()
-
-                return WeatherData(
-                    city=data.get("name", city),
-                    temperature=data["main"]["temp"],
-                    description=data["weather"][0]["main"],
-                    cloudProvider="AWS",
-                    isFailover=False,
-                    lastUpdated=datetime.utcnow().isoformat(),
-                    feels_like=data["main"]["feels_like"],
-                    humidity=data["main"]["humidity"],
-                    pressure=data["main"]["pressure"],
-                    wind_speed=data["wind"]["speed"],
-                    cloudiness=data["clouds"]["all"]
-                )
+            response = await self.client.get(
+                f"{self.base_url}/weather",
+                params=params
+            )
+            
+            # Handle 401/403 - API key issues
+            if response.status_code == 401:
+                logger.error("Invalid API key: Unauthorized access to OpenWeatherMap API")
+                return None
+            if response.status_code == 403:
+                logger.error("API key forbidden: Check API permissions and quota")
+                return None
+            
+            # Handle 404 - City not found
+            if response.status_code == 404:
+                logger.warning(f"City not found in OpenWeatherMap: {city}")
+                return None
+            
+            response.raise_for_status()
+            data = response.json()
+
+            weather_data = WeatherData(
+                city=data.get("name", city),
+                temperature=data["main"]["temp"],
+                description=data["weather"][0]["main"],
+                cloudProvider=self.settings.cloud_provider,
+                isFailover=False,
+                lastUpdated=datetime.utcnow().isoformat(),
+                feels_like=data["main"]["feels_like"],
+                humidity=data["main"]["humidity"],
+                pressure=data["main"]["pressure"],
+                wind_speed=data["wind"]["speed"],
+                cloudiness=data["clouds"]["all"]
+            )
+            return weather_data, ttl_for_observation(data, self.settings)
 
         except httpx.HTTPStatusError as e:
             logger.error(
@@ -136,16 +187,12 @@ class WeatherService:
     async def health_check(self) -> bool:
         """Check if OpenWeatherMap API is accessible."""
         try:
-            async with httpx.AsyncClient(timeout=5) as client:
-                response = await client.get(
-                    f"{self.base_url}/weather",
-                    params={"q": "London", "appid": self.api_key}
-                )
-                return response.status_code == 200
+            response = await self.client.get(
+                f"{self.base_url}/weather",
+                params={"q": "London", "appid": self.api_key},
+                timeout=5
+            )
+            return response.status_code == 200
         except Exception as e:
             logger.error(f"Health check failed: {str(e)}")
             return False
-
-
-# Global weather service instance
-weather_service = WeatherService()
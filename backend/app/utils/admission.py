@@ -0,0 +1,122 @@
+"""Admission control and load shedding for upstream-bound requests."""
+import asyncio
+import time
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import parse_qs
+from fastapi.responses import JSONResponse
+from app.utils.logging import get_logger
+from app.utils.metrics import (
+    admission_queue_depth,
+    admission_in_flight,
+    admission_wait_duration,
+    admission_requests,
+    admission_shed,
+)
+
+logger = get_logger(__name__)
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware capping concurrent upstream-bound requests.
+
+    Requests the cache can answer bypass admission entirely; the entry read
+    to decide that is handed to the handler in ``scope["state"]`` as
+    ``cached_weather`` so the cache is read only once. The rest take a free
+    slot or, once saturated, wait up to ``queue_timeout`` seconds in
+    a bounded queue and are shed with a fast 503 and ``Retry-After`` when
+    the queue is full or the wait expires.
+    """
+
+    def __init__(
+        self,
+        app,
+        paths: Iterable[str] = ("/weather",),
+        max_concurrent: int = 20,
+        max_queue: int = 50,
+        queue_timeout: float = 2.0,
+        retry_after: int = 1
+    ):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._waiting = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        # Cache hits never need the upstream, so they never take a slot
+        cached = await self._cached(scope)
+        if cached:
+            scope.setdefault("state", {})["cached_weather"] = cached
+            admission_requests.labels(outcome="bypass").inc()
+            await self.app(scope, receive, send)
+            return
+
+        if self._slots.locked():
+            if self._waiting >= self.max_queue:
+                await self._shed(scope, receive, send, "queue_full")
+                return
+            if not await self._wait_for_slot():
+                await self._shed(scope, receive, send, "timeout")
+                return
+        else:
+            # A slot is free; acquiring it does not suspend
+            await self._slots.acquire()
+
+        admission_requests.labels(outcome="admitted").inc()
+        admission_in_flight.inc()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission_in_flight.dec()
+            self._slots.release()
+
+    async def _wait_for_slot(self) -> bool:
+        self._waiting += 1
+        admission_queue_depth.set(self._waiting)
+        start_time = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiting -= 1
+            admission_queue_depth.set(self._waiting)
+            admission_wait_duration.observe(time.perf_counter() - start_time)
+
+    async def _cached(self, scope) -> Optional[Dict[str, Any]]:
+        city = self._city(scope)
+        container = getattr(scope["app"].state, "container", None) if "app" in scope else None
+        if not city or not container:
+            return None
+        return await container.weather.get_cached(city)
+
+    @staticmethod
+    def _city(scope) -> Optional[str]:
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        values = query.get("city")
+        return values[0] if values else None
+
+    async def _shed(self, scope, receive, send, reason: str):
+        admission_requests.labels(outcome="shed").inc()
+        admission_shed.labels(reason=reason).inc()
+        logger.warning("Request shed by admission control", extra={
+            "reason": reason,
+            "path": scope.get("path")
+        })
+        response = JSONResponse(
+            status_code=503,
+            content={
+                "error": "Service is busy fetching weather data. Please retry shortly.",
+                "code": "HTTP_503"
+            },
+            headers={"Retry-After": str(self.retry_after)}
+        )
+        await response(scope, receive, send)
@@ -2,13 +2,12 @@
 import logging
 import json
 from pythonjsonlogger import jsonlogger
-from app.config import settings
 
 
-def setup_logging():
+def setup_logging(level: str = "INFO"):
     """Configure structured JSON logging."""
     logger = logging.getLogger()
-    logger.setLevel(settings.log_level)
+    logger.setLevel(level)
 
     # Remove default handlers
     for handler in logger.handlers[:]:
@@ -0,0 +1,121 @@
+"""Event-loop lag monitoring and blocking-call detection."""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Optional
+from app.utils.logging import get_logger
+from app.utils.metrics import event_loop_lag, event_loop_stalls
+
+logger = get_logger(__name__)
+
+# Frames kept per stall report, innermost last
+STACK_LIMIT = 30
+
+
+class LoopMonitor:
+    """
+    Measures event-loop lag and captures stacks of blocking code.
+
+    A coroutine wakes every ``interval`` seconds and records how late it
+    was. A daemon thread watches that heartbeat; when the loop has not
+    ticked for longer than ``stall_threshold`` it snapshots the loop
+    thread's current stack, which points at the blocking call. Nothing is
+    added to the request path.
+    """
+
+    def __init__(self, interval: float = 0.1, stall_threshold: float = 0.25, max_reports: int = 20):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.max_lag = 0.0
+        self.stall_count = 0
+        self.stalls: "deque[Dict[str, Any]]" = deque(maxlen=max_reports)
+        self._heartbeat = 0.0
+        self._loop_thread_id: Optional[int] = None
+        self._active_stall: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Start monitoring the running event loop."""
+        if self._task:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._tick())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        """Stop the ticker and watchdog thread."""
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._thread = None
+
+    async def _tick(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._heartbeat = time.monotonic()
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - started - self.interval, 0.0)
+            event_loop_lag.observe(lag)
+            self.max_lag = max(self.max_lag, lag)
+            stall = self._active_stall
+            if stall:
+                stall["total_lag_ms"] = round(lag * 1000, 1)
+                self._active_stall = None
+
+    def _watch(self):
+        poll = min(self.interval, self.stall_threshold) / 2
+        reported_heartbeat = None
+        while not self._stopped.wait(poll):
+            heartbeat = self._heartbeat
+            blocked_for = time.monotonic() - heartbeat - self.interval
+            if blocked_for < self.stall_threshold or heartbeat == reported_heartbeat:
+                continue
+            reported_heartbeat = heartbeat
+            self._report(blocked_for)
+
+    def _report(self, blocked_for: float):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = [
+            f"{entry.filename}:{entry.lineno} in {entry.name}"
+            for entry in traceback.extract_stack(frame, limit=STACK_LIMIT)
+        ] if frame else []
+        stall = {
+            "detected_at": datetime.utcnow().isoformat(),
+            "blocked_for_ms": round(blocked_for * 1000, 1),
+            "total_lag_ms": None,
+            "stack": stack
+        }
+        self.stalls.append(stall)
+        self._active_stall = stall
+        self.stall_count += 1
+        event_loop_stalls.inc()
+        logger.warning("Event loop stalled", extra={
+            "blocked_for_ms": stall["blocked_for_ms"],
+            "stack": stack
+        })
+
+    def report(self, include_stacks: bool = True) -> Dict[str, Any]:
+        """Lag summary and recent stall reports for the debug endpoint."""
+        stalls = list(self.stalls)
+        if not include_stacks:
+            stalls = [{k: v for k, v in stall.items() if k != "stack"} for stall in stalls]
+        return {
+            "running": self._task is not None,
+            "interval_seconds": self.interval,
+            "stall_threshold_seconds": self.stall_threshold,
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "stall_count": self.stall_count,
+            "recent_stalls": stalls
+        }
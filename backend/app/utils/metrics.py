@@ -42,6 +42,133 @@ cache_misses = Counter(
     ["key"]
 )
 
+cache_codec_decodes = Counter(
+    "cache_codec_decodes_total",
+    "Cache values decoded by storage format",
+    ["format"]
+)
+
+cache_invalidated_keys = Counter(
+    "cache_invalidated_keys_total",
+    "Cache keys removed by targeted invalidation jobs"
+)
+
+cache_write_behind_depth = Gauge(
+    "cache_write_behind_queue_depth",
+    "Cache writes waiting to be flushed to Redis"
+)
+
+cache_write_behind_flush_duration = Histogram(
+    "cache_write_behind_flush_duration_seconds",
+    "Duration of pipelined write-behind flushes in seconds",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5)
+)
+
+cache_write_behind_dropped = Counter(
+    "cache_write_behind_dropped_total",
+    "Cache writes dropped before reaching Redis",
+    ["reason"]
+)
+
+cache_ttl = Histogram(
+    "cache_ttl_seconds",
+    "TTL assigned to cached weather entries in seconds",
+    buckets=(60, 120, 300, 600, 900, 1800, 3600)
+)
+
+cache_snapshot_keys = Counter(
+    "cache_snapshot_keys_total",
+    "Cache keys exported to or restored from snapshots",
+    ["operation"]
+)
+
+cache_snapshot_duration = Histogram(
+    "cache_snapshot_duration_seconds",
+    "Cache snapshot export/restore duration in seconds",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+cache_export_entries = Counter(
+    "cache_export_entries_total",
+    "Cached weather entries streamed by /weather/export",
+    ["format"]
+)
+
+# Replication metrics
+cache_replication_lag = Gauge(
+    "cache_replication_lag_seconds",
+    "Age of the newest cache write applied to a peer region",
+    ["peer"]
+)
+
+cache_replication_entries = Counter(
+    "cache_replication_entries_total",
+    "Cache replication events applied to peer regions",
+    ["peer", "op"]
+)
+
+cache_replication_batch_duration = Histogram(
+    "cache_replication_batch_duration_seconds",
+    "Duration of applying a replication batch to a peer in seconds",
+    ["peer"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+cache_replication_errors = Counter(
+    "cache_replication_errors_total",
+    "Failed replication batches per peer",
+    ["peer"]
+)
+
+# Admission control metrics
+admission_queue_depth = Gauge(
+    "admission_queue_depth",
+    "Upstream-bound requests waiting for an admission slot"
+)
+
+admission_in_flight = Gauge(
+    "admission_in_flight",
+    "Upstream-bound requests currently admitted"
+)
+
+admission_wait_duration = Histogram(
+    "admission_wait_duration_seconds",
+    "Time spent waiting for an admission slot in seconds",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+admission_requests = Counter(
+    "admission_requests_total",
+    "Requests seen by admission control by outcome",
+    ["outcome"]
+)
+
+admission_shed = Counter(
+    "admission_shed_total",
+    "Requests rejected with 503 by admission control",
+    ["reason"]
+)
+
+# Rate limiting metrics
+rate_limit_decisions = Counter(
+    "rate_limit_decisions_total",
+    "Rate limit decisions (allowed/rejected/rejected_local/unchecked)",
+    ["decision"]
+)
+
+# Event loop metrics
+event_loop_lag = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between scheduled and actual event loop wake-ups in seconds",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+event_loop_stalls = Counter(
+    "event_loop_stalls_total",
+    "Times the event loop was blocked longer than the stall threshold"
+)
+
 # Health check
 api_health = Gauge(
     "weather_api_health",
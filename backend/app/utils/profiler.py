@@ -0,0 +1,133 @@
+"""On-demand statistical profiling of the current worker process."""
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+Stack = Tuple[str, ...]
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is already running in this worker."""
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+def collapsed(samples: Counter) -> str:
+    """Render samples in Brendan Gregg's collapsed-stack format."""
+    return "".join(
+        f"{';'.join(stack)} {count}\n"
+        for stack, count in samples.most_common()
+    )
+
+
+def speedscope(samples: Counter, interval: float, name: str) -> Dict[str, Any]:
+    """Render samples as a speedscope ``sampled`` profile document."""
+    frames: List[Dict[str, Any]] = []
+    index: Dict[str, int] = {}
+    stacks, weights = [], []
+    for stack, count in samples.most_common():
+        ids = []
+        for frame in stack:
+            if frame not in index:
+                index[frame] = len(frames)
+                frames.append({"name": frame})
+            ids.append(index[frame])
+        stacks.append(ids)
+        weights.append(round(count * interval, 6))
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "exporter": "weather-tracker-api",
+        "name": name,
+        "activeProfileIndex": 0,
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": round(sum(weights), 6),
+            "samples": stacks,
+            "weights": weights
+        }]
+    }
+
+
+class Profiler:
+    """
+    Samples the stacks of every thread in this process, or traces allocations.
+
+    Sampling runs in a helper thread, so the event loop keeps serving
+    requests while it is being observed. Only one profile runs per worker
+    at a time.
+    """
+
+    def __init__(self, sample_interval: float = 0.005):
+        self.sample_interval = sample_interval
+        self._lock = asyncio.Lock()
+
+    @property
+    def pid(self) -> int:
+        """Process id of the worker being profiled."""
+        return os.getpid()
+
+    def _sample(self, seconds: float) -> Counter:
+        samples: Counter = Counter()
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                samples[tuple(reversed(stack))] += 1
+            time.sleep(self.sample_interval)
+        return samples
+
+    async def cpu(self, seconds: float) -> Counter:
+        """Sample all thread stacks for ``seconds`` and return stack counts."""
+        if self._lock.locked():
+            raise ProfilerBusyError("A profile is already running in this worker")
+        async with self._lock:
+            return await asyncio.to_thread(self._sample, seconds)
+
+    async def allocations(self, seconds: float, top: int = 25, frames: int = 10) -> List[Dict[str, Any]]:
+        """Trace allocations for ``seconds`` and return the largest growth sites."""
+        if self._lock.locked():
+            raise ProfilerBusyError("A profile is already running in this worker")
+        async with self._lock:
+            started_here = not tracemalloc.is_tracing()
+            if started_here:
+                tracemalloc.start(frames)
+            try:
+                baseline = tracemalloc.take_snapshot()
+                await asyncio.sleep(seconds)
+                snapshot = tracemalloc.take_snapshot()
+            finally:
+                if started_here:
+                    tracemalloc.stop()
+
+            stats = snapshot.compare_to(baseline, "traceback")[:top]
+            return [
+                {
+                    "size_diff_bytes": stat.size_diff,
+                    "size_bytes": stat.size,
+                    "count_diff": stat.count_diff,
+                    "count": stat.count,
+                    "traceback": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+                }
+                for stat in stats
+            ]
@@ -0,0 +1,211 @@
+"""Per-client rate limiting backed by a Redis GCRA script."""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from app.utils.logging import get_logger
+from app.utils.metrics import rate_limit_decisions
+
+logger = get_logger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+# Bucket name shared by every path limited by the default rate
+DEFAULT_ROUTE = "*"
+
+# Generic cell rate algorithm: one key per client holding its theoretical
+# arrival time (TAT) in milliseconds. Uses the Redis clock so all pods agree.
+# Returns {allowed, remaining, reset_ms, retry_after_ms}.
+GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local interval = period / limit
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if allow_at > now then
+    return {0, 0, math.ceil(tat - now), math.ceil(allow_at - now)}
+end
+redis.call('SET', KEYS[1], string.format('%d', new_tat), 'PX', math.ceil(new_tat - now))
+return {1, math.floor((now + period - new_tat) / interval), math.ceil(new_tat - now), 0}
+"""
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """
+    Parse a rate such as ``60/minute`` into ``(limit, period_seconds)``.
+
+    Raises:
+        ValueError: If the rate is malformed
+    """
+    try:
+        count, unit = rate.strip().split("/", 1)
+        limit, period = int(count), PERIODS[unit.strip().lower()]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate limit '{rate}', expected '<count>/<second|minute|hour|day>'")
+    if limit <= 0:
+        raise ValueError(f"Invalid rate limit '{rate}', count must be positive")
+    return limit, period
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware enforcing per-client request rates.
+
+    Clients presenting one of the configured ``api_keys`` in ``X-API-Key``
+    are identified by that key; everyone else by IP address, so clients
+    cannot mint fresh buckets with made-up keys. Behind ``trusted_proxies``
+    reverse proxies the IP is the ``X-Forwarded-For`` entry appended by the
+    outermost trusted proxy; entries further left are client-supplied and
+    ignored. Each route may have its own limit; the decision is made by an
+    atomic GCRA script in Redis. Clients Redis has already rejected are
+    remembered in-process until their retry time, so a flood is turned
+    away without a Redis round trip. If Redis is unavailable requests are
+    allowed through.
+    """
+
+    def __init__(
+        self,
+        app,
+        default_rate: str = "120/minute",
+        route_rates: Optional[Dict[str, str]] = None,
+        exempt_paths: Iterable[str] = (),
+        key_prefix: str = "wt",
+        trusted_proxies: int = 0,
+        api_keys: Iterable[str] = (),
+        max_tracked_clients: int = 10000
+    ):
+        self.app = app
+        self.default_limit = parse_rate(default_rate)
+        self.route_limits = {path: parse_rate(rate) for path, rate in (route_rates or {}).items()}
+        self.exempt_paths = frozenset(exempt_paths)
+        self.key_prefix = key_prefix
+        self.trusted_proxies = trusted_proxies
+        self._api_keys = frozenset(self._hash_key(key.encode()) for key in api_keys)
+        self.max_tracked_clients = max_tracked_clients
+        # "<route>|<client>" -> monotonic time until which the client is rejected locally
+        self._blocked: "OrderedDict[str, float]" = OrderedDict()
+        self._script = None
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path")
+        if scope["type"] != "http" or path in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        # Every path without its own limit shares one default bucket
+        route = path if path in self.route_limits else DEFAULT_ROUTE
+        limit, period = self.route_limits.get(route, self.default_limit)
+        bucket = f"{route}|{self._client_id(scope)}"
+
+        # In-process pre-check for clients already known to be over the limit
+        blocked_until = self._blocked.get(bucket)
+        if blocked_until:
+            remaining_block = blocked_until - time.monotonic()
+            if remaining_block > 0:
+                rate_limit_decisions.labels(decision="rejected_local").inc()
+                await self._reject(scope, receive, send, limit, period, remaining_block)
+                return
+            del self._blocked[bucket]
+
+        result = await self._check(scope, bucket, limit, period)
+        if result is None:
+            rate_limit_decisions.labels(decision="unchecked").inc()
+            await self.app(scope, receive, send)
+            return
+
+        allowed, remaining, reset_ms, retry_after_ms = result
+        if not allowed:
+            rate_limit_decisions.labels(decision="rejected").inc()
+            self._block(bucket, retry_after_ms / 1000)
+            await self._reject(scope, receive, send, limit, period, retry_after_ms / 1000)
+            return
+
+        rate_limit_decisions.labels(decision="allowed").inc()
+        headers = self._headers(limit, period, remaining, reset_ms / 1000)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                response_headers = MutableHeaders(scope=message)
+                for name, value in headers.items():
+                    response_headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    def _client_id(self, scope) -> str:
+        headers = dict(scope.get("headers") or [])
+        api_key = headers.get(b"x-api-key")
+        if api_key:
+            # Never store raw API keys in Redis key names
+            key_hash = self._hash_key(api_key)
+            if key_hash in self._api_keys:
+                return "key:" + key_hash[:16]
+
+        forwarded = headers.get(b"x-forwarded-for") if self.trusted_proxies else None
+        if forwarded:
+            # Each trusted proxy appends the address it received from, so
+            # only the last ``trusted_proxies`` entries can be relied on
+            hops = [hop.strip() for hop in forwarded.decode("latin-1").split(",")]
+            if len(hops) >= self.trusted_proxies:
+                return "ip:" + hops[-self.trusted_proxies]
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    @staticmethod
+    def _hash_key(api_key: bytes) -> str:
+        return hashlib.sha256(api_key).hexdigest()
+
+    async def _check(self, scope, bucket: str, limit: int, period: int):
+        container = getattr(scope["app"].state, "container", None) if "app" in scope else None
+        client = container.cache.client if container else None
+        if not client:
+            return None
+
+        try:
+            if self._script is None:
+                self._script = client.register_script(GCRA_SCRIPT)
+            result = await self._script(
+                keys=[f"{self.key_prefix}:ratelimit:{bucket}"],
+                args=[limit, period * 1000],
+                client=client
+            )
+            return tuple(int(value) for value in result)
+        except Exception as e:
+            logger.warning("Rate limit check failed; allowing request", extra={"error": str(e)})
+            return None
+
+    def _block(self, bucket: str, seconds: float):
+        self._blocked[bucket] = time.monotonic() + seconds
+        self._blocked.move_to_end(bucket)
+        while len(self._blocked) > self.max_tracked_clients:
+            self._blocked.popitem(last=False)
+
+    @staticmethod
+    def _headers(limit: int, period: int, remaining: int, reset: float) -> Dict[str, str]:
+        return {
+            "RateLimit-Limit": str(limit),
+            "RateLimit-Remaining": str(max(remaining, 0)),
+            "RateLimit-Reset": str(max(int(reset + 0.999), 0)),
+            "RateLimit-Policy": f"{limit};w={period}"
+        }
+
+    async def _reject(self, scope, receive, send, limit: int, period: int, retry_after: float):
+        retry_after = max(int(retry_after + 0.999), 1)
+        headers = self._headers(limit, period, 0, retry_after)
+        headers["Retry-After"] = str(retry_after)
+        response = JSONResponse(
+            status_code=429,
+            content={
+                "error": "Rate limit exceeded. Please slow down.",
+                "code": "HTTP_429"
+            },
+            headers=headers
+        )
+        await response(scope, receive, send)
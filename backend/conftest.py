@@ -1,13 +1,16 @@
 """Configuration for pytest."""
 import pytest
 from fastapi.testclient import TestClient
-from app.main import app
+from app.config import Settings
+from app.main import create_app
+from app.services.cache import CacheService
 
 
 @pytest.fixture
-def client():
-    """Fixture that provides a test client."""
-    return TestClient(app)
+def client(settings):
+    """Fixture that provides a test client with the application lifespan running."""
+    with TestClient(create_app(settings)) as test_client:
+        yield test_client
 
 
 @pytest.fixture
@@ -17,3 +20,25 @@ def event_loop():
     loop = asyncio.get_event_loop_policy().new_event_loop()
     yield loop
     loop.close()
+
+
+@pytest.fixture
+def settings():
+    """Fixture that provides settings independent of the environment."""
+    return Settings(openweather_api_key="test", replication_enabled=False)
+
+
+@pytest.fixture
+def redis_server():
+    """Fixture that provides an in-memory Redis server."""
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def cache(settings, redis_server):
+    """Fixture that provides a cache service backed by the in-memory Redis."""
+    import fakeredis
+    service = CacheService(settings)
+    service.client = fakeredis.FakeAsyncRedis(server=redis_server)
+    return service
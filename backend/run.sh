@@ -60,4 +60,4 @@ echo "💚 Health check: http://localhost:8000/health"
 echo "🌤️  Weather API: http://localhost:8000/weather?city=London"
 echo ""
 
-uvicorn app.main:app --reload --host 0.0.0.0 --port 8000
+uvicorn app.main:create_app --factory --reload --host 0.0.0.0 --port 8000
@@ -1,19 +1,17 @@
 """Unit tests for Weather Tracker API."""
+import os
+import subprocess
+import sys
 import pytest
-from fastapi.testclient import TestClient
 from unittest.mock import patch, AsyncMock
-from app.main import app
 from app.models import WeatherData
 from datetime import datetime
 
 
-client = TestClient(app)
-
-
 class TestHealthEndpoint:
     """Tests for health check endpoint."""
 
-    def test_health_check_success(self):
+    def test_health_check_success(self, client):
         """Test successful health check."""
         response = client.get("/health")
         assert response.status_code == 200
@@ -22,7 +20,7 @@ class TestHealthEndpoint:
         assert "version" in data
         assert data["version"] == "1.0.0"
 
-    def test_health_check_has_timestamp(self):
+    def test_health_check_has_timestamp(self, client):
         """Test health check includes timestamp."""
         response = client.get("/health")
         data = response.json()
@@ -32,19 +30,19 @@ class TestHealthEndpoint:
 class TestWeatherEndpoint:
     """Tests for weather endpoint."""
 
-    @patch("app.services.weather.weather_service.get_weather")
-    def test_get_weather_success(self, mock_get_weather):
+    @patch("app.services.weather.WeatherService.get_weather", new_callable=AsyncMock)
+    def test_get_weather_success(self, mock_get_weather, client):
         """Test successful weather retrieval."""
         mock_data = WeatherData(
             city="London",
             temperature=10.5,
+            description="Clouds",
+            lastUpdated=datetime.utcnow().isoformat(),
             feels_like=9.2,
             humidity=72,
             pressure=1013,
-            weather="Cloudy",
             wind_speed=3.5,
-            cloudiness=85,
-            timestamp=datetime.utcnow()
+            cloudiness=85
         )
         mock_get_weather.return_value = mock_data
 
@@ -55,20 +53,20 @@ class TestWeatherEndpoint:
         assert data["temperature"] == 10.5
         assert data["humidity"] == 72
 
-    @patch("app.services.weather.weather_service.get_weather")
-    def test_get_weather_not_found(self, mock_get_weather):
+    @patch("app.services.weather.WeatherService.get_weather", new_callable=AsyncMock)
+    def test_get_weather_not_found(self, mock_get_weather, client):
         """Test weather not found response."""
         mock_get_weather.return_value = None
 
         response = client.get("/weather?city=NonexistentCity")
         assert response.status_code == 404
 
-    def test_get_weather_missing_city_parameter(self):
+    def test_get_weather_missing_city_parameter(self, client):
         """Test weather endpoint without city parameter."""
         response = client.get("/weather")
         assert response.status_code == 422  # Unprocessable Entity
 
-    def test_get_weather_empty_city(self):
+    def test_get_weather_empty_city(self, client):
         """Test weather endpoint with empty city."""
         response = client.get("/weather?city=")
         assert response.status_code == 422
@@ -77,13 +75,13 @@ class TestWeatherEndpoint:
 class TestMetricsEndpoint:
     """Tests for Prometheus metrics endpoint."""
 
-    def test_metrics_endpoint_success(self):
+    def test_metrics_endpoint_success(self, client):
         """Test metrics endpoint returns data."""
         response = client.get("/metrics")
         assert response.status_code == 200
         assert "weather_api_requests_total" in response.text or response.text
 
-    def test_metrics_content_type(self):
+    def test_metrics_content_type(self, client):
         """Test metrics endpoint content type."""
         response = client.get("/metrics")
         assert "text/plain" in response.headers.get("content-type", "")
@@ -92,8 +90,8 @@ class TestMetricsEndpoint:
 class TestCacheEndpoint:
     """Tests for cache management."""
 
-    @patch("app.services.cache.cache.clear")
-    async def test_clear_cache_success(self, mock_clear):
+    @patch("app.services.cache.CacheService.clear", new_callable=AsyncMock)
+    def test_clear_cache_success(self, mock_clear, client):
         """Test successful cache clear."""
         mock_clear.return_value = True
 
@@ -106,7 +104,7 @@ class TestCacheEndpoint:
 class TestRootEndpoint:
     """Tests for root endpoint."""
 
-    def test_root_endpoint(self):
+    def test_root_endpoint(self, client):
         """Test root endpoint returns API info."""
         response = client.get("/")
         assert response.status_code == 200
@@ -121,16 +119,36 @@ class TestRootEndpoint:
 class TestErrorHandling:
     """Tests for error handling."""
 
-    def test_404_not_found(self):
+    def test_404_not_found(self, client):
         """Test 404 error response."""
         response = client.get("/nonexistent")
         assert response.status_code == 404
 
-    def test_invalid_query_parameter(self):
+    def test_invalid_query_parameter(self, client):
         """Test invalid query parameter handling."""
         response = client.get("/weather?invalid=param")
         assert response.status_code == 422
 
+    def test_service_unavailable_without_lifespan(self, settings):
+        """Test requests return 503 when the application container is not started."""
+        from fastapi.testclient import TestClient
+        from app.main import create_app
+
+        response = TestClient(create_app(settings)).get("/health")
+        assert response.status_code == 503
+
+    def test_import_does_not_parse_settings(self):
+        """Test importing the application module needs no configuration."""
+        env = {k: v for k, v in os.environ.items() if k != "OPENWEATHER_API_KEY"}
+        script = "import app.main, app.config; assert not app.config.get_settings.cache_info().currsize"
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            env=env,
+            capture_output=True
+        )
+        assert result.returncode == 0, result.stderr.decode()
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,146 @@
+"""Tests for admission control middleware."""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from prometheus_client import REGISTRY
+from app.services.weather import WeatherService
+from app.utils.admission import AdmissionControlMiddleware
+
+
+def make_scope(city="London", cached=None):
+    """Build an HTTP scope for /weather with a stub container."""
+    async def get_cached(_city):
+        return cached
+
+    container = SimpleNamespace(weather=SimpleNamespace(get_cached=get_cached))
+    return {
+        "type": "http",
+        "path": "/weather",
+        "query_string": f"city={city}".encode(),
+        "app": SimpleNamespace(state=SimpleNamespace(container=container)),
+    }
+
+
+async def call(middleware, scope):
+    """Run one request through the middleware and return the response status."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    starts = [m for m in messages if m["type"] == "http.response.start"]
+    return starts[0]["status"] if starts else 200
+
+
+def wait_count():
+    """Number of observations in the admission wait histogram."""
+    return REGISTRY.get_sample_value("admission_wait_duration_seconds_count") or 0
+
+
+class TestAdmissionControl:
+    """Tests for AdmissionControlMiddleware."""
+
+    def test_free_slot_not_counted_as_waiting(self):
+        """Test requests admitted immediately record no queue wait."""
+        slots_seen = []
+
+        async def app(scope, receive, send):
+            slots_seen.append(middleware._slots._value)
+
+        middleware = AdmissionControlMiddleware(app, max_concurrent=2)
+        before = wait_count()
+        assert asyncio.run(call(middleware, make_scope())) == 200
+        assert slots_seen == [1]
+        assert wait_count() == before
+        assert middleware._waiting == 0
+
+    def test_cache_hits_do_not_take_slots(self):
+        """Test cache-servable requests leave every slot free."""
+        slots_seen = []
+
+        async def app(scope, receive, send):
+            slots_seen.append(middleware._slots._value)
+
+        middleware = AdmissionControlMiddleware(app, max_concurrent=2)
+        asyncio.run(call(middleware, make_scope(cached={"city": "London"})))
+        assert slots_seen == [2]
+
+    def test_cache_hit_handed_to_handler(self):
+        """Test the entry read for the bypass decision reaches the handler."""
+        seen = []
+
+        async def app(scope, receive, send):
+            seen.append(scope.get("state", {}).get("cached_weather"))
+
+        middleware = AdmissionControlMiddleware(app)
+        asyncio.run(call(middleware, make_scope(cached={"city": "London"})))
+        asyncio.run(call(middleware, make_scope("Paris")))
+        assert seen == [{"city": "London"}, None]
+
+    def test_saturated_requests_wait_then_shed(self):
+        """Test misses queue behind a busy slot and are shed on timeout."""
+        release = None
+
+        async def app(scope, receive, send):
+            await release.wait()
+
+        middleware = AdmissionControlMiddleware(app, max_concurrent=1, queue_timeout=0.05)
+
+        async def scenario():
+            nonlocal release
+            release = asyncio.Event()
+            busy = asyncio.create_task(call(middleware, make_scope("Paris")))
+            await asyncio.sleep(0)
+            before = wait_count()
+            status = await call(middleware, make_scope())
+            release.set()
+            await busy
+            return status, wait_count() - before
+
+        assert asyncio.run(scenario()) == (503, 1)
+
+    def test_queue_full_shed(self):
+        """Test misses are shed immediately when the queue is full."""
+        async def app(scope, receive, send):
+            await asyncio.sleep(1)
+
+        middleware = AdmissionControlMiddleware(app, max_concurrent=1, max_queue=0)
+
+        async def scenario():
+            busy = asyncio.create_task(call(middleware, make_scope("Paris")))
+            await asyncio.sleep(0)
+            status = await call(middleware, make_scope())
+            busy.cancel()
+            await asyncio.gather(busy, return_exceptions=True)
+            return status
+
+        assert asyncio.run(scenario()) == 503
+
+
+class TestCachedHandoff:
+    """Tests for reusing the admission cache read in the handler."""
+
+    def test_get_weather_skips_cache_read(self, settings, cache):
+        """Test a handed-over entry is served without reading Redis again."""
+        entry = {
+            "city": "London",
+            "temperature": 10.0,
+            "description": "Clouds",
+            "cloudProvider": "AWS",
+            "isFailover": False,
+            "lastUpdated": "2024-01-15T10:30:00",
+            "feels_like": 9.0,
+            "humidity": 70,
+            "pressure": 1012,
+            "wind_speed": 5.0,
+            "cloudiness": 75,
+        }
+        cache.get = AsyncMock(return_value=None)
+        service = WeatherService(settings, cache)
+        weather = asyncio.run(service.get_weather("London", cached_data=entry))
+        assert weather.city == "London"
+        cache.get.assert_not_called()
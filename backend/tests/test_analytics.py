@@ -0,0 +1,57 @@
+"""Tests for probabilistic traffic analytics."""
+import asyncio
+from app.services import analytics as analytics_module
+from app.services.analytics import CountMinSketch, HyperLogLog, TrafficAnalytics, _hash
+
+
+class TestSketches:
+    """Tests for the underlying data structures."""
+
+    def test_count_min_never_underestimates(self):
+        """Test Count-Min estimates are at least the true count."""
+        sketch = CountMinSketch(width=64, depth=4)
+        for i in range(500):
+            sketch.add(_hash(f"city{i % 50}"))
+        assert all(sketch.estimate(_hash(f"city{i}")) >= 10 for i in range(50))
+
+    def test_hyperloglog_estimate_within_error(self):
+        """Test HyperLogLog counts distinct keys within a few standard errors."""
+        hll = HyperLogLog(precision=12)
+        for i in range(10000):
+            hll.add(_hash(f"city{i}"))
+        assert abs(hll.count() - 10000) <= 10000 * hll.std_error * 4
+
+
+class TestPendingBuffer:
+    """Tests for the bounded buffer of cities awaiting a Redis flush."""
+
+    def test_pending_capped_across_hours(self, settings, monkeypatch):
+        """Test the buffer cap covers all hours, not each hour separately."""
+        monkeypatch.setattr(analytics_module, "MAX_PENDING_CITIES", 10)
+        settings.analytics_redis_merge = True
+        analytics = TrafficAnalytics(settings)
+        analytics._pending[analytics.hour] = {f"earlier{i}" for i in range(8)}
+        analytics._pending_count = 8
+        for i in range(20):
+            analytics.record(f"city{i}", hit=False)
+        assert sum(len(cities) for cities in analytics._pending.values()) == 10
+        assert analytics._pending_count == 10
+
+    def test_stale_hours_dropped(self, settings):
+        """Test hours older than the report window are forgotten on rollover."""
+        settings.analytics_redis_merge = True
+        analytics = TrafficAnalytics(settings)
+        analytics._pending["2000010100"] = {"london", "paris"}
+        analytics._pending_count = 2
+        analytics.hour = "2000010100"
+        analytics.record("rome", hit=False)
+        assert "2000010100" not in analytics._pending
+        assert analytics._pending_count == 1
+
+    def test_flush_without_redis_keeps_buffer_bounded(self, settings):
+        """Test flushing without Redis neither fails nor grows the buffer."""
+        settings.analytics_redis_merge = True
+        analytics = TrafficAnalytics(settings)
+        analytics.record("london", hit=True)
+        asyncio.run(analytics.flush())
+        assert analytics._pending_count == 1
@@ -0,0 +1,157 @@
+"""Tests for the Redis cache service."""
+import asyncio
+import json
+from app.services.invalidation import InvalidationService, escape_glob
+from app.services.weather import cache_key
+
+
+class TestGenerationNamespacing:
+    """Tests for generation-based keys and invalidation."""
+
+    def test_set_get_uses_generation_prefix(self, cache):
+        """Test values are stored under the current generation."""
+        async def scenario():
+            await cache.set("weather:london", {"city": "London"}, ttl=60)
+            assert await cache.client.exists("wt:g0:weather:london")
+            return await cache.get("weather:london")
+
+        assert asyncio.run(scenario()) == {"city": "London"}
+
+    def test_clear_bumps_generation(self, cache):
+        """Test clearing makes existing entries unreachable."""
+        async def scenario():
+            await cache.set("weather:london", {"city": "London"}, ttl=60)
+            assert await cache.clear()
+            return await cache.generation(), await cache.get("weather:london")
+
+        assert asyncio.run(scenario()) == (1, None)
+
+    def test_legacy_key_read_before_first_clear(self, cache):
+        """Test unprefixed JSON entries from earlier releases are still served."""
+        async def scenario():
+            await cache.client.set("weather:rome", json.dumps({"city": "Rome"}))
+            found = await cache.get("weather:rome"), await cache.contains("weather:rome")
+            await cache.clear()
+            return found, await cache.get("weather:rome")
+
+        assert asyncio.run(scenario()) == (({"city": "Rome"}, True), None)
+
+    def test_delete_removes_legacy_key(self, cache):
+        """Test deleting a key also removes its legacy unprefixed entry."""
+        async def scenario():
+            await cache.client.set("weather:rome", json.dumps({"city": "Rome"}))
+            await cache.delete("weather:rome")
+            return await cache.client.exists("weather:rome")
+
+        assert asyncio.run(scenario()) == 0
+
+
+class TestWriteBehind:
+    """Tests for the write-behind queue."""
+
+    @staticmethod
+    def _slow_pipelines(cache, delay):
+        pipeline = cache.client.pipeline
+
+        def slow_pipeline(*args, **kwargs):
+            pipe = pipeline(*args, **kwargs)
+            execute = pipe.execute
+
+            async def slow_execute(*a, **kw):
+                await asyncio.sleep(delay)
+                return await execute(*a, **kw)
+
+            pipe.execute = slow_execute
+            return pipe
+
+        cache.client.pipeline = slow_pipeline
+
+    def test_pending_writes_served_before_flush(self, cache):
+        """Test queued writes are readable before they reach Redis."""
+        async def scenario():
+            cache.set_behind("weather:london", {"city": "London"}, ttl=60)
+            return await cache.get("weather:london"), await cache.client.exists("wt:g0:weather:london")
+
+        assert asyncio.run(scenario()) == ({"city": "London"}, 0)
+
+    def test_close_waits_for_in_flight_batch(self, cache, redis_server):
+        """Test shutdown during a flush still writes every queued entry."""
+        import fakeredis
+
+        async def scenario():
+            self._slow_pipelines(cache, 0.1)
+            cache.start()
+            for city in ("london", "paris", "rome"):
+                cache.set_behind(f"weather:{city}", {"city": city}, ttl=60)
+            # Close while the flusher is inside pipe.execute()
+            await asyncio.sleep(cache.settings.cache_write_behind_flush_interval + 0.05)
+            await cache.close()
+            client = fakeredis.FakeAsyncRedis(server=redis_server)
+            return len(await client.keys("wt:g0:weather:*"))
+
+        assert asyncio.run(scenario()) == 3
+
+    def test_cancelled_batch_requeued(self, cache):
+        """Test a batch interrupted by cancellation goes back on the queue."""
+        async def scenario():
+            self._slow_pipelines(cache, 1)
+            for city in ("london", "paris"):
+                cache.set_behind(f"weather:{city}", {"city": city}, ttl=60)
+            task = asyncio.create_task(cache.flush())
+            await asyncio.sleep(0.05)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return list(cache._pending)
+
+        assert asyncio.run(scenario()) == ["weather:london", "weather:paris"]
+
+    def test_in_flight_batch_readable(self, cache):
+        """Test entries being flushed stay readable until Redis has them."""
+        async def scenario():
+            self._slow_pipelines(cache, 0.1)
+            cache.set_behind("weather:london", {"city": "London"}, ttl=60)
+            task = asyncio.create_task(cache.flush())
+            await asyncio.sleep(0.05)
+            during = await cache.get("weather:london"), await cache.contains("weather:london")
+            await task
+            return during, cache._in_flight, await cache.get("weather:london")
+
+        during, in_flight, after = asyncio.run(scenario())
+        assert during == ({"city": "London"}, True)
+        assert in_flight == {}
+        assert after == {"city": "London"}
+
+    def test_deleted_in_flight_entry_not_requeued(self, cache):
+        """Test a key deleted mid-flush is neither served nor put back on cancel."""
+        async def scenario():
+            self._slow_pipelines(cache, 0.2)
+            cache.set_behind("weather:london", {"city": "London"}, ttl=60)
+            task = asyncio.create_task(cache.flush())
+            await asyncio.sleep(0.05)
+            delete = asyncio.create_task(cache.delete("weather:london"))
+            await asyncio.sleep(0)
+            found = await cache.get("weather:london")
+            task.cancel()
+            await asyncio.gather(task, delete, return_exceptions=True)
+            return found, list(cache._pending)
+
+        assert asyncio.run(scenario()) == (None, [])
+
+
+class TestCacheKey:
+    """Tests for city cache key normalisation."""
+
+    def test_cache_key_normalised(self):
+        """Test surrounding spaces and case map to one key."""
+        assert cache_key("  London ") == cache_key("london") == "weather:london"
+
+    def test_city_invalidation_matches_cache_key(self, settings, cache):
+        """Test a city invalidation pattern built from cache_key matches the stored entry."""
+        async def scenario():
+            invalidation = InvalidationService(settings, cache)
+            await cache.set(cache_key("Rome"), {"city": "Rome"}, ttl=60)
+            job = await invalidation.start(escape_glob(cache_key(" Rome ")))
+            await asyncio.gather(*invalidation._tasks)
+            return (await invalidation.get(job.id)).deleted, await cache.get(cache_key("Rome"))
+
+        assert asyncio.run(scenario()) == (1, None)
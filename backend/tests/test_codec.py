@@ -0,0 +1,114 @@
+"""Tests for the binary cache value codec."""
+import json
+import msgpack
+import pytest
+from app.services import codec
+
+
+WEATHER = {
+    "city": "London",
+    "temperature": 10.5,
+    "description": "Clouds",
+    "cloudProvider": "AWS",
+    "isFailover": False,
+    "lastUpdated": "2024-01-15T10:30:00",
+    "feels_like": 9.2,
+    "humidity": 72,
+    "pressure": 1013,
+    "wind_speed": 3.5,
+    "cloudiness": 85,
+}
+
+
+class TestCodecRoundTrip:
+    """Tests for encode/decode round trips."""
+
+    def test_weather_round_trip_uses_schema(self):
+        """Test known weather payloads use the positional schema."""
+        raw = codec.encode(WEATHER)
+        assert raw[:2] == codec.MAGIC
+        assert raw[2] == codec.VERSION
+        assert raw[3] & codec.FLAG_SCHEMA
+        assert codec.decode(raw) == WEATHER
+
+    def test_schema_is_smaller_than_json(self):
+        """Test the schema encoding is more compact than JSON."""
+        assert len(codec.encode(WEATHER)) < len(json.dumps(WEATHER))
+
+    def test_unknown_shape_falls_back_to_map(self):
+        """Test payloads not matching a schema are stored as plain maps."""
+        value = {**WEATHER, "extra": "field"}
+        raw = codec.encode(value)
+        assert not raw[3] & codec.FLAG_SCHEMA
+        assert codec.decode(raw) == value
+
+    def test_reordered_fields_fall_back_to_map(self):
+        """Test schemas only match the exact frozen field order."""
+        value = dict(reversed(list(WEATHER.items())))
+        raw = codec.encode(value)
+        assert not raw[3] & codec.FLAG_SCHEMA
+        assert codec.decode(raw) == value
+
+    def test_non_dict_round_trip(self):
+        """Test non-mapping values round trip."""
+        assert codec.decode(codec.encode([1, "two", 3.0])) == [1, "two", 3.0]
+
+
+class TestCodecCompression:
+    """Tests for zstd compression of large values."""
+
+    def test_small_values_not_compressed(self):
+        """Test values under the threshold are stored uncompressed."""
+        assert not codec.encode(WEATHER)[3] & codec.FLAG_ZSTD
+
+    def test_large_values_compressed(self):
+        """Test values over the threshold are zstd-compressed."""
+        pytest.importorskip("zstandard")
+        value = {"payload": "x" * (codec.COMPRESS_MIN_BYTES * 2)}
+        raw = codec.encode(value)
+        assert raw[3] & codec.FLAG_ZSTD
+        assert len(raw) < codec.COMPRESS_MIN_BYTES
+        assert codec.decode(raw) == value
+
+
+class TestCodecCompatibility:
+    """Tests for legacy entries and invalid headers."""
+
+    def test_legacy_json_decoded(self):
+        """Test entries written as JSON by earlier releases still decode."""
+        assert codec.decode(json.dumps(WEATHER).encode()) == WEATHER
+
+    def test_unknown_version_rejected(self):
+        """Test values from a newer format version raise CodecError."""
+        raw = codec.encode(WEATHER)
+        newer = raw[:2] + bytes((codec.VERSION + 1,)) + raw[3:]
+        with pytest.raises(codec.CodecError):
+            codec.decode(newer)
+
+    def test_truncated_header_rejected(self):
+        """Test a value with only the magic bytes raises CodecError."""
+        with pytest.raises(codec.CodecError):
+            codec.decode(codec.MAGIC + bytes((codec.VERSION,)))
+
+    def test_unknown_schema_rejected(self):
+        """Test a schema id this release does not know raises CodecError."""
+        raw = codec.MAGIC + bytes((codec.VERSION, codec.FLAG_SCHEMA)) + msgpack.packb([99, []])
+        with pytest.raises(codec.CodecError):
+            codec.decode(raw)
+
+
+class TestReplicaFlag:
+    """Tests for marking replicated values."""
+
+    def test_mark_replica(self):
+        """Test replica marking keeps the value decodable."""
+        raw = codec.mark_replica(codec.encode(WEATHER))
+        assert codec.is_replica(raw)
+        assert codec.decode(raw) == WEATHER
+        assert not codec.is_replica(codec.encode(WEATHER))
+
+    def test_legacy_json_not_marked(self):
+        """Test legacy JSON values are returned unchanged."""
+        raw = json.dumps(WEATHER).encode()
+        assert codec.mark_replica(raw) == raw
+        assert not codec.is_replica(raw)
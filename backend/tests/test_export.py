@@ -0,0 +1,108 @@
+"""Tests for the streaming cache export."""
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+import msgpack
+from app.services import codec
+from app.services.export import export_stream, iter_cached_weather
+
+
+async def collect(cache, settings, output="ndjson"):
+    """Join the chunks of an export stream."""
+    return b"".join([chunk async for chunk in export_stream(cache, settings, output)])
+
+
+class TestIterCachedWeather:
+    """Tests for walking the current cache generation."""
+
+    def test_only_current_generation_exported(self, cache):
+        """Test entries from before a clear are not exported."""
+        async def scenario():
+            await cache.set("weather:london", {"city": "London"}, ttl=60)
+            await cache.clear()
+            await cache.set("weather:paris", {"city": "Paris"}, ttl=60)
+            return [record async for chunk in iter_cached_weather(cache, 10) for record in chunk]
+
+        assert asyncio.run(scenario()) == [{"city": "Paris"}]
+
+    def test_pending_writes_flushed_first(self, cache):
+        """Test write-behind entries not yet in Redis are exported."""
+        async def scenario():
+            cache.set_behind("weather:rome", {"city": "Rome"}, ttl=60)
+            return [record async for chunk in iter_cached_weather(cache, 10) for record in chunk]
+
+        assert asyncio.run(scenario()) == [{"city": "Rome"}]
+
+    def test_expired_and_undecodable_entries_skipped(self, cache):
+        """Test entries expiring mid-walk or failing to decode are skipped."""
+        async def scenario():
+            await cache.set("weather:london", {"city": "London"}, ttl=60)
+            await cache.client.set(await cache.namespaced("weather:broken"), b"WT\x09\x00")
+            await cache.client.set(await cache.namespaced("weather:gone"), codec.encode({"city": "Gone"}))
+            mget = cache.client.mget
+
+            async def expire_during_walk(keys):
+                # Simulate the key expiring between SCAN and MGET
+                await cache.client.unlink(await cache.namespaced("weather:gone"))
+                return await mget(keys)
+
+            with patch.object(cache.client, "mget", side_effect=expire_during_walk):
+                return [record async for chunk in iter_cached_weather(cache, 10) for record in chunk]
+
+        assert asyncio.run(scenario()) == [{"city": "London"}]
+
+    def test_replicas_marked_failover(self, cache):
+        """Test values replicated from a peer region are flagged."""
+        async def scenario():
+            value = codec.mark_replica(codec.encode({"city": "Oslo", "isFailover": False}))
+            await cache.client.set(await cache.namespaced("weather:oslo"), value)
+            return [record async for chunk in iter_cached_weather(cache, 10) for record in chunk]
+
+        assert asyncio.run(scenario()) == [{"city": "Oslo", "isFailover": True}]
+
+
+class TestExportStream:
+    """Tests for export encodings."""
+
+    def test_ndjson(self, cache, settings):
+        """Test one JSON object per line stamped with this region's provider."""
+        async def scenario():
+            await cache.set("weather:london", {"city": "London"}, ttl=60)
+            await cache.set("weather:paris", {"city": "Paris"}, ttl=60)
+            return await collect(cache, settings)
+
+        lines = asyncio.run(scenario()).splitlines()
+        records = sorted((json.loads(line) for line in lines), key=lambda r: r["city"])
+        assert records == [
+            {"city": "London", "cloudProvider": settings.cloud_provider},
+            {"city": "Paris", "cloudProvider": settings.cloud_provider},
+        ]
+
+    def test_msgpack(self, cache, settings):
+        """Test concatenated MessagePack maps."""
+        async def scenario():
+            await cache.set("weather:london", {"city": "London"}, ttl=60)
+            return await collect(cache, settings, "msgpack")
+
+        unpacker = msgpack.Unpacker(raw=False)
+        unpacker.feed(asyncio.run(scenario()))
+        assert list(unpacker) == [{"city": "London", "cloudProvider": settings.cloud_provider}]
+
+    def test_empty_cache(self, cache, settings):
+        """Test an empty cache exports nothing."""
+        assert asyncio.run(collect(cache, settings)) == b""
+
+
+class TestExportEndpoint:
+    """Tests for GET /weather/export."""
+
+    @patch("app.services.cache.CacheService.is_connected", new_callable=AsyncMock, return_value=False)
+    def test_unavailable_without_redis(self, mock_connected, client):
+        """Test export returns 503 when Redis is down."""
+        response = client.get("/weather/export")
+        assert response.status_code == 503
+
+    def test_unknown_format_rejected(self, client):
+        """Test formats other than ndjson and msgpack are rejected."""
+        response = client.get("/weather/export?format=csv")
+        assert response.status_code == 422
@@ -0,0 +1,125 @@
+"""Tests for response-time unit conversion and translation."""
+import asyncio
+import time
+import httpx
+from app.models import WeatherData
+from app.services import codec
+from app.services.localization import localize, normalize_lang
+from app.services.weather import WeatherService, cache_key
+
+
+def make_weather(**overrides):
+    """Canonical metric observation."""
+    data = {
+        "city": "London",
+        "temperature": 10.0,
+        "description": "Clouds",
+        "lastUpdated": "2024-01-15T10:30:00",
+        "feels_like": -5.0,
+        "humidity": 72,
+        "pressure": 1013,
+        "wind_speed": 5.0,
+        "cloudiness": 85,
+    }
+    data.update(overrides)
+    return WeatherData(**data)
+
+
+class TestLocalize:
+    """Tests for localize."""
+
+    def test_metric_english_unchanged(self):
+        """Test the canonical form is returned as is."""
+        weather = make_weather()
+        assert localize(weather) is weather
+        assert weather.units == "metric"
+
+    def test_imperial_conversion(self):
+        """Test Fahrenheit temperatures and mph wind speed."""
+        weather = localize(make_weather(), "imperial")
+        assert weather.units == "imperial"
+        assert weather.temperature == 50.0
+        assert weather.feels_like == 23.0
+        assert weather.wind_speed == 11.18
+
+    def test_standard_conversion(self):
+        """Test Kelvin temperatures with wind speed left in m/s."""
+        weather = localize(make_weather(), "standard")
+        assert weather.temperature == 283.15
+        assert weather.feels_like == 268.15
+        assert weather.wind_speed == 5.0
+
+    def test_description_translated(self):
+        """Test descriptions come from the bundled table."""
+        assert localize(make_weather(), lang="de").description == "Bewölkt"
+        assert localize(make_weather(), lang="pt").description == "Nublado"
+
+    def test_unknown_description_passed_through(self):
+        """Test descriptions missing from the table stay in English."""
+        assert localize(make_weather(description="Aurora"), lang="fr").description == "Aurora"
+
+    def test_pressure_and_humidity_unchanged(self):
+        """Test unit systems share hPa and percentages."""
+        weather = localize(make_weather(), "imperial", "ja")
+        assert (weather.pressure, weather.humidity, weather.cloudiness) == (1013, 72, 85)
+
+
+class TestNormalizeLang:
+    """Tests for normalize_lang."""
+
+    def test_regional_variant_falls_back(self):
+        """Test region suffixes map to the base language."""
+        assert normalize_lang("pt-BR") == "pt"
+        assert normalize_lang("FR_ca") == "fr"
+
+    def test_exact_regional_code(self):
+        """Test codes bundled with a region are kept."""
+        assert normalize_lang("zh-CN") == "zh_cn"
+
+    def test_unknown_language(self):
+        """Test unsupported languages return None."""
+        assert normalize_lang("xx") is None
+
+
+class TestCanonicalCaching:
+    """Tests that converted responses never change what is cached."""
+
+    def test_cached_value_stays_canonical(self, settings, cache):
+        """Test an imperial German request caches the metric English observation."""
+        def upstream(request):
+            assert request.url.params["units"] == "metric"
+            return httpx.Response(200, json={
+                "name": "London",
+                "dt": int(time.time()) - 60,
+                "main": {"temp": 10.0, "feels_like": 9.0, "humidity": 70, "pressure": 1012},
+                "weather": [{"id": 803, "main": "Clouds"}],
+                "wind": {"speed": 5.0},
+                "clouds": {"all": 75},
+            })
+
+        async def scenario():
+            service = WeatherService(settings, cache)
+            service.client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+            response = await service.get_weather("London", units="imperial", lang="de")
+            await service.close()
+            cached = codec.decode(cache._pending[cache_key("London")][0])
+            return response, cached
+
+        response, cached = asyncio.run(scenario())
+        assert (response.temperature, response.description, response.units) == (50.0, "Bewölkt", "imperial")
+        assert "units" not in cached
+        assert (cached["temperature"], cached["description"]) == (10.0, "Clouds")
+
+
+class TestWeatherEndpointParameters:
+    """Tests for units and lang validation on /weather."""
+
+    def test_unknown_language_rejected(self, client):
+        """Test unsupported languages return 400."""
+        response = client.get("/weather?city=London&lang=xx")
+        assert response.status_code == 400
+
+    def test_unknown_units_rejected(self, client):
+        """Test unsupported unit systems return 400."""
+        response = client.get("/weather?city=London&units=kelvin")
+        assert response.status_code == 400
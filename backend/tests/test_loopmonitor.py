@@ -0,0 +1,107 @@
+"""Tests for event loop monitoring."""
+import asyncio
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.config import Settings
+from app.main import create_app
+from app.utils.loopmonitor import LoopMonitor
+
+STALL = {
+    "detected_at": "2024-01-15T10:30:00",
+    "blocked_for_ms": 300.0,
+    "total_lag_ms": 400.0,
+    "stack": ["/app/app/main.py:1 in handler"],
+}
+
+
+@pytest.fixture
+def debug_client(request):
+    """Client for an app built with the debug token given by the test's param."""
+    settings = Settings(openweather_api_key="test", replication_enabled=False, debug_token=request.param)
+    with TestClient(create_app(settings)) as test_client:
+        test_client.app.state.container.loop_monitor.stalls.append(STALL)
+        yield test_client
+
+
+class TestDebugLoopEndpoint:
+    """Tests for GET /debug/loop."""
+
+    @pytest.mark.parametrize("debug_client", [None], indirect=True)
+    def test_stacks_hidden_without_token(self, debug_client):
+        """Test stall stacks are withheld when no debug token is configured."""
+        response = debug_client.get("/debug/loop")
+        assert response.status_code == 200
+        stall = response.json()["recent_stalls"][0]
+        assert "stack" not in stall
+        assert stall["total_lag_ms"] == 400.0
+
+    @pytest.mark.parametrize("debug_client", ["secret"], indirect=True)
+    def test_wrong_token_rejected(self, debug_client):
+        """Test a missing or wrong X-Debug-Token is rejected."""
+        assert debug_client.get("/debug/loop").status_code == 403
+        assert debug_client.get("/debug/loop", headers={"X-Debug-Token": "guess"}).status_code == 403
+
+    @pytest.mark.parametrize("debug_client", ["secret"], indirect=True)
+    def test_stacks_served_with_token(self, debug_client):
+        """Test the configured token unlocks stall stacks."""
+        response = debug_client.get("/debug/loop", headers={"X-Debug-Token": "secret"})
+        assert response.json()["recent_stalls"] == [STALL]
+
+
+def block_loop(seconds):
+    """Blocking call the watchdog should catch."""
+    time.sleep(seconds)
+
+
+class TestLoopMonitor:
+    """Tests for LoopMonitor."""
+
+    def test_stall_reported_with_blocking_frame(self):
+        """Test blocking the loop records a stall pointing at the blocking call."""
+        monitor = LoopMonitor(interval=0.02, stall_threshold=0.05)
+
+        async def scenario():
+            monitor.start()
+            await asyncio.sleep(0.05)
+            block_loop(0.3)
+            # Let the ticker wake up and record the total lag
+            await asyncio.sleep(0.05)
+            await monitor.stop()
+
+        asyncio.run(scenario())
+        assert monitor.stall_count == 1
+        stall = monitor.stalls[0]
+        assert stall["blocked_for_ms"] >= 50
+        assert stall["total_lag_ms"] >= 250
+        assert any("in block_loop" in frame for frame in stall["stack"])
+        assert monitor.max_lag >= 0.25
+
+    def test_no_stall_when_idle(self):
+        """Test an idle loop records no stalls."""
+        monitor = LoopMonitor(interval=0.02, stall_threshold=0.1)
+
+        async def scenario():
+            monitor.start()
+            await asyncio.sleep(0.2)
+            await monitor.stop()
+
+        asyncio.run(scenario())
+        assert monitor.stall_count == 0
+
+    def test_stop_shuts_down_ticker_and_watchdog(self):
+        """Test stop cancels the ticker task and ends the watchdog thread."""
+        monitor = LoopMonitor(interval=0.02, stall_threshold=0.05)
+
+        async def scenario():
+            monitor.start()
+            task, thread = monitor._task, monitor._thread
+            assert thread.is_alive()
+            await monitor.stop()
+            thread.join(timeout=1)
+            return task, thread
+
+        task, thread = asyncio.run(scenario())
+        assert task.cancelled()
+        assert not thread.is_alive()
+        assert not monitor.report()["running"]
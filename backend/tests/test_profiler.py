@@ -0,0 +1,123 @@
+"""Tests for the on-demand profiler."""
+import asyncio
+import threading
+import tracemalloc
+from collections import Counter
+from unittest.mock import AsyncMock
+import pytest
+from fastapi.testclient import TestClient
+from app.config import Settings
+from app.main import create_app
+from app.utils.profiler import Profiler, ProfilerBusyError, collapsed, speedscope
+
+SAMPLES = Counter({
+    ("MainThread", "main (app.py:1)", "handler (app.py:10)"): 3,
+    ("MainThread", "main (app.py:1)"): 1,
+})
+
+
+def make_client(**overrides):
+    """Client for an app built with profiler settings overridden."""
+    settings = Settings(openweather_api_key="test", replication_enabled=False, **overrides)
+    return TestClient(create_app(settings))
+
+
+class TestRendering:
+    """Tests for profile output formats."""
+
+    def test_collapsed(self):
+        """Test one semicolon-joined stack per line, most frequent first."""
+        assert collapsed(SAMPLES) == (
+            "MainThread;main (app.py:1);handler (app.py:10) 3\n"
+            "MainThread;main (app.py:1) 1\n"
+        )
+
+    def test_speedscope(self):
+        """Test samples reference shared frames and are weighted by interval."""
+        document = speedscope(SAMPLES, 0.01, "worker")
+        assert document["shared"]["frames"] == [
+            {"name": "MainThread"},
+            {"name": "main (app.py:1)"},
+            {"name": "handler (app.py:10)"},
+        ]
+        profile = document["profiles"][0]
+        assert profile["type"] == "sampled"
+        assert profile["samples"] == [[0, 1, 2], [0, 1]]
+        assert profile["weights"] == [0.03, 0.01]
+        assert profile["endValue"] == 0.04
+
+
+class TestProfiler:
+    """Tests for Profiler."""
+
+    def test_cpu_samples_other_threads(self):
+        """Test sampling captures stacks of threads other than the sampler."""
+        profiler = Profiler(sample_interval=0.001)
+        samples = asyncio.run(profiler.cpu(0.05))
+        assert samples
+        assert any(stack[0] == threading.main_thread().name for stack in samples)
+
+    def test_concurrent_profile_rejected(self):
+        """Test a second profile while one runs raises ProfilerBusyError."""
+        profiler = Profiler(sample_interval=0.001)
+
+        async def scenario():
+            running = asyncio.create_task(profiler.cpu(0.05))
+            await asyncio.sleep(0)
+            with pytest.raises(ProfilerBusyError):
+                await profiler.allocations(0.01)
+            await running
+
+        asyncio.run(scenario())
+
+    def test_allocations_stop_tracing_they_started(self):
+        """Test tracemalloc is stopped afterwards only if the profiler started it."""
+        profiler = Profiler()
+
+        async def allocate():
+            task = asyncio.create_task(profiler.allocations(0.05, top=5))
+            garbage = [bytearray(1024) for _ in range(100)]
+            return await task, garbage
+
+        assert not tracemalloc.is_tracing()
+        allocations, _ = asyncio.run(allocate())
+        assert not tracemalloc.is_tracing()
+        assert len(allocations) <= 5
+        assert {"size_diff_bytes", "count_diff", "traceback"} <= set(allocations[0])
+
+        tracemalloc.start()
+        try:
+            asyncio.run(profiler.allocations(0.01))
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+
+
+class TestDebugProfileEndpoint:
+    """Tests for GET /debug/profile."""
+
+    def test_disabled_by_default(self):
+        """Test the endpoint is hidden unless the profiler is enabled."""
+        with make_client() as client:
+            assert client.get("/debug/profile").status_code == 404
+
+    def test_wrong_token_rejected(self):
+        """Test a wrong X-Debug-Token returns 403."""
+        with make_client(profiler_enabled=True, debug_token="secret") as client:
+            response = client.get("/debug/profile", headers={"X-Debug-Token": "guess"})
+            assert response.status_code == 403
+
+    def test_seconds_clamped(self):
+        """Test the duration is capped at profiler_max_seconds."""
+        with make_client(profiler_enabled=True, profiler_max_seconds=2) as client:
+            cpu = client.app.state.container.profiler.cpu = AsyncMock(return_value=SAMPLES)
+            response = client.get("/debug/profile?seconds=60")
+            assert response.status_code == 200
+            assert response.text == collapsed(SAMPLES)
+            cpu.assert_awaited_once_with(2)
+
+    def test_busy_profiler_conflict(self):
+        """Test a profile requested while another runs returns 409."""
+        with make_client(profiler_enabled=True) as client:
+            client.app.state.container.profiler.cpu = AsyncMock(side_effect=ProfilerBusyError("busy"))
+            assert client.get("/debug/profile?seconds=1").status_code == 409
@@ -0,0 +1,154 @@
+"""Tests for per-client rate limiting."""
+import asyncio
+from types import SimpleNamespace
+import pytest
+from app.utils.ratelimit import RateLimitMiddleware, parse_rate
+
+
+async def ok_app(scope, receive, send):
+    """Minimal ASGI app answering 200."""
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def make_scope(cache, path="/weather", api_key=None, ip="10.0.0.1", forwarded=None):
+    """Build an HTTP scope whose app state exposes the cache."""
+    headers = [(b"x-api-key", api_key.encode())] if api_key else []
+    if forwarded:
+        headers.append((b"x-forwarded-for", forwarded.encode()))
+    container = SimpleNamespace(cache=cache)
+    return {
+        "type": "http",
+        "path": path,
+        "headers": headers,
+        "client": (ip, 1234),
+        "app": SimpleNamespace(state=SimpleNamespace(container=container)),
+    }
+
+
+async def call(middleware, scope):
+    """Run one request and return (status, headers)."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    start = next(m for m in messages if m["type"] == "http.response.start")
+    return start["status"], {k.decode().lower(): v.decode() for k, v in start["headers"]}
+
+
+@pytest.fixture
+def lua():
+    """Skip when fakeredis cannot run Lua scripts."""
+    pytest.importorskip("lupa")
+
+
+class TestParseRate:
+    """Tests for parse_rate."""
+
+    def test_valid_rate(self):
+        """Test rates parse into limit and period seconds."""
+        assert parse_rate("60/minute") == (60, 60)
+
+    def test_invalid_rate(self):
+        """Test malformed rates raise ValueError."""
+        with pytest.raises(ValueError):
+            parse_rate("sixty per minute")
+
+
+class TestClientIdentity:
+    """Tests for how clients map to buckets."""
+
+    def test_unknown_api_keys_share_ip_bucket(self, cache, lua):
+        """Test random X-API-Key values do not get fresh buckets."""
+        middleware = RateLimitMiddleware(ok_app, route_rates={"/weather": "2/minute"})
+
+        async def scenario():
+            return [(await call(middleware, make_scope(cache, api_key=f"k{i}")))[0] for i in range(3)]
+
+        assert asyncio.run(scenario()) == [200, 200, 429]
+
+    def test_configured_api_key_has_own_bucket(self, cache, lua):
+        """Test configured API keys are limited separately from their IP."""
+        middleware = RateLimitMiddleware(
+            ok_app,
+            route_rates={"/weather": "1/minute"},
+            api_keys=["partner-key"]
+        )
+
+        async def scenario():
+            return [
+                (await call(middleware, make_scope(cache)))[0],
+                (await call(middleware, make_scope(cache, api_key="partner-key")))[0],
+                (await call(middleware, make_scope(cache, api_key="partner-key")))[0],
+            ]
+
+        assert asyncio.run(scenario()) == [200, 200, 429]
+
+    def test_spoofed_forwarded_entry_ignored(self, cache, lua):
+        """Test a client-supplied leading X-Forwarded-For entry does not change the bucket."""
+        middleware = RateLimitMiddleware(ok_app, route_rates={"/weather": "2/minute"}, trusted_proxies=1)
+
+        async def scenario():
+            return [
+                (await call(middleware, make_scope(cache, ip="172.18.0.5", forwarded=f"1.2.3.{i}, 203.0.113.7")))[0]
+                for i in range(3)
+            ]
+
+        assert asyncio.run(scenario()) == [200, 200, 429]
+
+    def test_clients_behind_proxy_have_own_buckets(self, cache, lua):
+        """Test clients sharing the proxy's address are limited separately."""
+        middleware = RateLimitMiddleware(ok_app, route_rates={"/weather": "1/minute"}, trusted_proxies=1)
+
+        async def scenario():
+            return [
+                (await call(middleware, make_scope(cache, ip="172.18.0.5", forwarded=client)))[0]
+                for client in ("203.0.113.7", "203.0.113.8", "203.0.113.7")
+            ]
+
+        assert asyncio.run(scenario()) == [200, 200, 429]
+
+    def test_multiple_trusted_hops(self, cache):
+        """Test the client is the entry appended by the outermost trusted proxy."""
+        middleware = RateLimitMiddleware(ok_app, trusted_proxies=2)
+        scope = make_scope(cache, forwarded="6.6.6.6, 203.0.113.7, 10.1.0.4")
+        assert middleware._client_id(scope) == "ip:203.0.113.7"
+
+    def test_forwarded_ignored_without_trusted_proxies(self, cache):
+        """Test X-Forwarded-For is ignored when no proxy is trusted."""
+        middleware = RateLimitMiddleware(ok_app)
+        assert middleware._client_id(make_scope(cache, forwarded="203.0.113.7")) == "ip:10.0.0.1"
+
+
+class TestRouteBuckets:
+    """Tests for per-route buckets."""
+
+    def test_unconfigured_paths_share_default_bucket(self, cache, lua):
+        """Test varying the path does not reset the default limit."""
+        middleware = RateLimitMiddleware(ok_app, default_rate="120/minute")
+
+        async def scenario():
+            return [
+                (await call(middleware, make_scope(cache, path=f"/nope{i}")))[1]["ratelimit-remaining"]
+                for i in range(3)
+            ]
+
+        assert asyncio.run(scenario()) == ["119", "118", "117"]
+
+    def test_configured_route_has_own_bucket(self, cache, lua):
+        """Test routes with their own rate are limited independently."""
+        middleware = RateLimitMiddleware(ok_app, default_rate="1/minute", route_rates={"/weather": "1/minute"})
+
+        async def scenario():
+            return [
+                (await call(middleware, make_scope(cache, path="/weather")))[0],
+                (await call(middleware, make_scope(cache, path="/other")))[0],
+                (await call(middleware, make_scope(cache, path="/another")))[0],
+            ]
+
+        assert asyncio.run(scenario()) == [200, 200, 429]
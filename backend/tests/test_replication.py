@@ -0,0 +1,164 @@
+"""Tests for cross-region cache replication between two Redis servers."""
+import asyncio
+import pytest
+from app.services import codec
+from app.services.cache import CacheService
+from app.services.replication import PeerReplicator
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+PEER_URL = "redis://peer-redis:6380/0"
+
+
+@pytest.fixture
+def replicating(settings, cache):
+    """Fixture that enables replication on the local cache."""
+    settings.replication_enabled = True
+    settings.replication_peers = [PEER_URL]
+    settings.replication_block_ms = 10
+    return cache
+
+
+@pytest.fixture
+def peer_server():
+    """Fixture that provides the peer region's Redis server."""
+    return fakeredis.FakeServer()
+
+
+def make_replicator(settings, cache, peer_server, consumer="worker-1"):
+    """Build a replicator whose peer client talks to the peer server."""
+    replicator = PeerReplicator(settings, cache, PEER_URL)
+    replicator.client = fakeredis.FakeAsyncRedis(server=peer_server)
+    replicator.consumer = consumer
+    return replicator
+
+
+def peer_cache(settings, peer_server):
+    """Cache service reading the peer region's Redis."""
+    service = CacheService(settings)
+    service.client = fakeredis.FakeAsyncRedis(server=peer_server)
+    return service
+
+
+class TestReplication:
+    """Tests for shipping cache operations to a peer."""
+
+    def test_set_replicated_as_failover_with_remaining_ttl(self, settings, replicating, peer_server):
+        """Test writes reach the peer marked as replicas with their TTL."""
+        async def scenario():
+            replicator = make_replicator(settings, replicating, peer_server)
+            await replicator.step()
+            await replicating.set("weather:london", {"city": "London", "isFailover": False}, ttl=100)
+            await replicator.step()
+            peer = peer_cache(settings, peer_server)
+            raw = await peer.client.get("wt:g0:weather:london")
+            return codec.is_replica(raw), await peer.client.pttl("wt:g0:weather:london"), await peer.get("weather:london")
+
+        is_replica, ttl_ms, value = asyncio.run(scenario())
+        assert is_replica
+        assert 95_000 < ttl_ms <= 100_000
+        assert value == {"city": "London", "isFailover": True}
+
+    def test_set_then_delete_applied_in_order(self, settings, replicating, peer_server):
+        """Test a delete after a set leaves the key absent on the peer."""
+        async def scenario():
+            replicator = make_replicator(settings, replicating, peer_server)
+            await replicator.step()
+            await replicating.set("weather:london", {"city": "London"}, ttl=100)
+            await replicating.delete("weather:london")
+            await replicator.step()
+            return await peer_cache(settings, peer_server).client.exists("wt:g0:weather:london")
+
+        assert asyncio.run(scenario()) == 0
+
+    def test_replayed_clear_bumps_generation_once(self, settings, replicating, peer_server):
+        """Test re-applying a batch after a failed XACK is a no-op."""
+        async def scenario():
+            replicator = make_replicator(settings, replicating, peer_server)
+            await replicator.step()
+            await replicating.clear()
+            await replicating.set("weather:paris", {"city": "Paris"}, ttl=100)
+            entries = await replicator._read()
+            await replicator._apply(entries)
+            await replicator._apply(entries)
+            peer = peer_cache(settings, peer_server)
+            return await peer.generation(), await peer.get("weather:paris")
+
+        generation, value = asyncio.run(scenario())
+        assert generation == 1
+        assert value["city"] == "Paris"
+
+    def test_pattern_invalidation_replicated(self, settings, replicating, peer_server):
+        """Test pattern invalidations unlink matching keys on the peer."""
+        async def scenario():
+            replicator = make_replicator(settings, replicating, peer_server)
+            await replicator.step()
+            await replicating.set("weather:london", {"city": "London"}, ttl=100)
+            await replicating.set("weather:paris", {"city": "Paris"}, ttl=100)
+            await replicating.publish_invalidation("weather:lon*")
+            await replicator.step()
+            return sorted(await peer_cache(settings, peer_server).client.keys("wt:g0:weather:*"))
+
+        assert asyncio.run(scenario()) == [b"wt:g0:weather:paris"]
+
+
+class TestReplicationStream:
+    """Tests for recording cache writes on the replication stream."""
+
+    def test_writes_recorded_with_peers(self, replicating):
+        """Test writes are appended to the stream when peers consume it."""
+        async def scenario():
+            await replicating.set("weather:london", {"city": "London"}, ttl=60)
+            await replicating.delete("weather:london")
+            return await replicating.client.xlen(replicating.replication_stream_key)
+
+        assert asyncio.run(scenario()) == 2
+
+    def test_no_stream_without_peers(self, settings, cache):
+        """Test enabling replication without peers writes nothing to the stream."""
+        settings.replication_enabled = True
+
+        async def scenario():
+            await cache.set("weather:london", {"city": "London"}, ttl=60)
+            cache.set_behind("weather:paris", {"city": "Paris"}, ttl=60)
+            await cache.flush()
+            await cache.clear()
+            await cache.publish_invalidation("weather:*")
+            return await cache.client.exists(cache.replication_stream_key)
+
+        assert asyncio.run(scenario()) == 0
+
+
+class TestReplicationLease:
+    """Tests for electing a single shipping worker per peer."""
+
+    def test_only_one_worker_holds_lease(self, settings, replicating, peer_server):
+        """Test a second worker cannot ship while the lease is held."""
+        async def scenario():
+            first = make_replicator(settings, replicating, peer_server, "worker-1")
+            second = make_replicator(settings, replicating, peer_server, "worker-2")
+            held = [await first._acquire_lease(), await second._acquire_lease(), await first._acquire_lease()]
+            await first.close()
+            held.append(await second._acquire_lease())
+            return held
+
+        assert asyncio.run(scenario()) == [True, False, True, True]
+
+    def test_new_leader_claims_unacknowledged_entries(self, settings, replicating, peer_server):
+        """Test entries read by a leader that died are applied by its successor."""
+        async def scenario():
+            dead = make_replicator(settings, replicating, peer_server, "worker-1")
+            await dead.step()
+            await replicating.set("weather:london", {"city": "London"}, ttl=100)
+            dead._retry_pending = False
+            dead._claim_orphans = False
+            assert await dead._read()  # read but never applied or acknowledged
+
+            successor = make_replicator(settings, replicating, peer_server, "worker-2")
+            successor._group_ready = True
+            assert await successor._acquire_lease()
+            await successor.step()
+            return await peer_cache(settings, peer_server).get("weather:london")
+
+        assert asyncio.run(scenario())["city"] == "London"
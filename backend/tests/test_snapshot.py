@@ -0,0 +1,103 @@
+"""Tests for cache snapshot export and restore."""
+import asyncio
+import pytest
+from app.services import snapshot
+from app.services.cache import CacheService
+from app.services.snapshot import SnapshotService, export_snapshot, restore_snapshot
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def target(settings):
+    """Fixture that provides an empty cache on a separate Redis server."""
+    service = CacheService(settings)
+    service.client = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+    return service
+
+
+class TestSnapshotRoundTrip:
+    """Tests for export followed by restore."""
+
+    def test_round_trip_keeps_remaining_ttl(self, cache, target, tmp_path, monkeypatch):
+        """Test restored entries keep their TTL minus the time since export."""
+        path = str(tmp_path / "cache.snap")
+
+        async def scenario():
+            await cache.set("weather:london", {"city": "London"}, ttl=100)
+            await cache.set("weather:paris", {"city": "Paris"}, ttl=2)
+            exported = await export_snapshot(cache, path, max_keys=100)
+
+            # Restore five seconds after the export
+            now_ms = snapshot._now_ms()
+            monkeypatch.setattr(snapshot, "_now_ms", lambda: now_ms + 5000)
+            restored = await restore_snapshot(target, path)
+            ttl_ms = await target.client.pttl("wt:g0:weather:london")
+            return exported["keys"], restored, ttl_ms, await target.get("weather:london")
+
+        keys, restored, ttl_ms, value = asyncio.run(scenario())
+        assert keys == 2
+        assert (restored["restored"], restored["expired"]) == (1, 1)
+        assert 90_000 < ttl_ms <= 95_000
+        assert value == {"city": "London"}
+
+    def test_restore_does_not_overwrite_existing(self, cache, target, tmp_path):
+        """Test fresher entries already in Redis win over the snapshot."""
+        path = str(tmp_path / "cache.snap")
+
+        async def scenario():
+            await cache.set("weather:london", {"city": "old"}, ttl=100)
+            await export_snapshot(cache, path, max_keys=100)
+            await target.set("weather:london", {"city": "new"}, ttl=100)
+            restored = await restore_snapshot(target, path)
+            return restored["existing"], await target.get("weather:london")
+
+        assert asyncio.run(scenario()) == (1, {"city": "new"})
+
+
+class TestSnapshotServiceRestore:
+    """Tests for the per-host restore lock."""
+
+    def test_waiting_worker_reports_peer_failure(self, settings, cache, tmp_path):
+        """Test a worker that lost the lock reports the holder's failure."""
+        path = tmp_path / "cache.snap"
+        path.write_bytes(b"not a snapshot")
+        settings.cache_snapshot_path = str(path)
+
+        async def scenario():
+            holder, waiter = SnapshotService(settings, cache), SnapshotService(settings, cache)
+            return await asyncio.gather(holder.restore(), waiter.restore())
+
+        holder_result, waiter_result = asyncio.run(scenario())
+        assert holder_result["status"] == "failed"
+        assert waiter_result["status"] == "peer_failed"
+
+    def test_waiting_worker_reports_peer_restore(self, settings, cache, tmp_path):
+        """Test a worker that lost the lock reports the holder's restore counts."""
+        path = str(tmp_path / "cache.snap")
+        settings.cache_snapshot_path = path
+
+        async def scenario():
+            await cache.set("weather:london", {"city": "London"}, ttl=100)
+            await export_snapshot(cache, path, max_keys=100)
+            holder, waiter = SnapshotService(settings, cache), SnapshotService(settings, cache)
+            return await asyncio.gather(holder.restore(), waiter.restore())
+
+        holder_result, waiter_result = asyncio.run(scenario())
+        assert holder_result["status"] == "restored"
+        assert waiter_result["status"] == "restored_by_peer"
+        assert waiter_result["existing"] == 1
+
+    def test_waiting_worker_reports_unknown_without_result(self, settings, cache, tmp_path):
+        """Test a worker reports unknown when the holder recorded nothing."""
+        path = tmp_path / "cache.snap"
+        path.write_bytes(b"")
+        settings.cache_snapshot_path = str(path)
+        settings.cache_snapshot_restore_timeout = 0.2
+
+        async def scenario():
+            service = SnapshotService(settings, cache)
+            await cache.client.set(service._lock_key("restore"), 1, px=100)
+            return await service.restore()
+
+        assert asyncio.run(scenario())["status"] == "unknown"
@@ -0,0 +1,69 @@
+"""Tests for adaptive cache TTLs."""
+from app.services.ttl import is_volatile, ttl_for_observation
+
+NOW = 1_700_000_000
+
+
+def observation(age, condition_id=803, wind_speed=3.0, **extra):
+    """Build a minimal upstream payload observed ``age`` seconds ago."""
+    return {
+        "dt": NOW - age,
+        "weather": [{"id": condition_id}],
+        "wind": {"speed": wind_speed},
+        **extra,
+    }
+
+
+class TestTtlForObservation:
+    """Tests for ttl_for_observation."""
+
+    def test_fresh_observation(self, settings):
+        """Test entries expire just after the next expected observation."""
+        ttl = ttl_for_observation(observation(age=120), settings, now=NOW)
+        assert ttl == settings.openweather_update_interval + settings.cache_ttl_grace - 120
+
+    def test_stale_observation_clamped_to_min(self, settings):
+        """Test observations past their update interval get the minimum TTL."""
+        ttl = ttl_for_observation(observation(age=3600), settings, now=NOW)
+        assert ttl == settings.cache_ttl_min
+
+    def test_ttl_capped_at_redis_cache_ttl(self, settings):
+        """Test the TTL never exceeds redis_cache_ttl."""
+        settings.openweather_update_interval = 2 * settings.redis_cache_ttl
+        ttl = ttl_for_observation(observation(age=0), settings, now=NOW)
+        assert ttl == settings.redis_cache_ttl
+
+    def test_volatile_conditions_scaled(self, settings):
+        """Test thunderstorms shorten the remaining lifetime."""
+        calm = ttl_for_observation(observation(age=120), settings, now=NOW)
+        stormy = ttl_for_observation(observation(age=120, condition_id=211), settings, now=NOW)
+        assert stormy == int(calm * settings.cache_ttl_volatile_factor)
+
+    def test_missing_dt_uses_default(self, settings):
+        """Test payloads without dt fall back to redis_cache_ttl."""
+        data = observation(age=120)
+        del data["dt"]
+        assert ttl_for_observation(data, settings, now=NOW) == settings.redis_cache_ttl
+
+    def test_adaptive_disabled_uses_default(self, settings):
+        """Test disabling adaptive TTLs always returns redis_cache_ttl."""
+        settings.cache_ttl_adaptive = False
+        assert ttl_for_observation(observation(age=120), settings, now=NOW) == settings.redis_cache_ttl
+
+
+class TestIsVolatile:
+    """Tests for is_volatile."""
+
+    def test_clouds_not_volatile(self, settings):
+        """Test calm cloudy conditions are not volatile."""
+        assert not is_volatile(observation(age=0), settings)
+
+    def test_precipitation_volatile(self, settings):
+        """Test rain and snow condition groups are volatile."""
+        assert is_volatile(observation(age=0, condition_id=501), settings)
+        assert is_volatile(observation(age=0, condition_id=601), settings)
+
+    def test_strong_wind_volatile(self, settings):
+        """Test wind at the threshold is volatile."""
+        wind = settings.cache_ttl_volatile_wind_speed
+        assert is_volatile(observation(age=0, wind_speed=wind), settings)